@@ -1,19 +1,247 @@
 import os
+import threading
+import time
 from contextlib import contextmanager
+from uuid import uuid4
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from .query_stats import track_queries
+from .slow_queries import SlowQueryLog
 
 SQLALCHEMY_DATABASE_URL = os.getenv("SUPABASE_PSQL_URL")
 
 if not SQLALCHEMY_DATABASE_URL:
     raise RuntimeError("SUPABASE_PSQL_URL environment variable is not set")
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name, default):
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Connection pool settings, tuned through the environment
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)  # seconds waiting for a free connection
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)  # seconds before a connection is replaced
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+DB_STATEMENT_TIMEOUT_MS = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)  # 0 disables the timeout
+# Statements slower than this are logged, 0 disables the slow-query log
+DB_SLOW_QUERY_MS = _env_float("DB_SLOW_QUERY_MS", 0)
+# Fraction of the slow SELECTs whose plan (EXPLAIN, not run again) is appended to the file
+DB_SLOW_QUERY_EXPLAIN_SAMPLE = _env_float("DB_SLOW_QUERY_EXPLAIN_SAMPLE", 0.0)
+DB_SLOW_QUERY_EXPLAIN_FILE = os.getenv("DB_SLOW_QUERY_EXPLAIN_FILE", "slow_queries.jsonl")
+# Supabase transaction pooler / PgBouncer in transaction mode: the pooler owns the server
+# connections, so no client-side pool, no session-level settings, no prepared statements
+DB_TRANSACTION_POOLER = _env_bool("DB_TRANSACTION_POOLER", False)
+
+
+class PoolMetrics:
+    """Thread-safe counters for pool checkouts and the time spent waiting for them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.invalidations = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def increment(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "invalidations": self.invalidations,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+slow_query_log = SlowQueryLog(
+    DB_SLOW_QUERY_MS, DB_SLOW_QUERY_EXPLAIN_SAMPLE, DB_SLOW_QUERY_EXPLAIN_FILE
+)
+
+
+class _CheckoutWaitMixin:
+    """Measures how long each checkout waits for a connection."""
+
+    metrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.record_wait(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_CheckoutWaitMixin, QueuePool):
+    metrics = pool_metrics
+
+
+class InstrumentedAsyncQueuePool(_CheckoutWaitMixin, AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
+
+
+def _pool_options(poolclass):
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if DB_TRANSACTION_POOLER:
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=poolclass,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return options
+
+
+def _engine_options():
+    options = _pool_options(InstrumentedQueuePool)
+    if DB_STATEMENT_TIMEOUT_MS and not DB_TRANSACTION_POOLER:
+        # Startup options are rejected by transaction poolers, see the begin hook below
+        options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def _async_engine_options():
+    options = _pool_options(InstrumentedAsyncQueuePool)
+    connect_args = {}
+    if DB_TRANSACTION_POOLER:
+        # asyncpg prepares every statement; named statements do not survive a transaction pooler
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+    elif DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def _async_database_url():
+    url = make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg")
+    query = dict(url.query)
+    # asyncpg takes `ssl` where libpq URLs carry `sslmode`
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return url.set(query=query)
+
+
+def _instrument_engine(sync_engine, metrics, name):
+    track_queries(sync_engine, name)
+    if DB_SLOW_QUERY_MS:
+        slow_query_log.track(sync_engine)
+
+    @event.listens_for(sync_engine, "connect")
+    def count_connect(dbapi_connection, connection_record):
+        metrics.increment("connects")
+
+    @event.listens_for(sync_engine, "checkout")
+    def count_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.increment("checkouts")
+
+    @event.listens_for(sync_engine, "invalidate")
+    def count_invalidation(dbapi_connection, connection_record, exception):
+        metrics.increment("invalidations")
+
+    if DB_TRANSACTION_POOLER and DB_STATEMENT_TIMEOUT_MS:
+
+        @event.listens_for(sync_engine, "begin")
+        def set_local_statement_timeout(conn):
+            # SET LOCAL only lasts for the transaction, so it never leaks to other pooler clients
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {DB_STATEMENT_TIMEOUT_MS}")
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options())
+_instrument_engine(engine, pool_metrics, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+class AsyncBackedSession(Session):
+    """Sync session class wrapped by AsyncSessionLocal, so session events can target it."""
+
+
+# The async engine is created on first use: only the FastAPI app ships asyncpg
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(_async_database_url(), **_async_engine_options())
+        _instrument_engine(_async_engine.sync_engine, async_pool_metrics, "async")
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(),
+            sync_session_class=AsyncBackedSession,
+            autoflush=False,
+            # Attributes stay loaded after commit: lazy refreshes cannot run outside a greenlet
+            expire_on_commit=False,
+        )
+    return _async_session_factory()
+
+
+def _engine_status(status_engine, metrics):
+    status = {"pool": status_engine.pool.__class__.__name__, **metrics.snapshot()}
+    if isinstance(status_engine.pool, QueuePool):
+        status.update(
+            size=status_engine.pool.size(),
+            checked_in=status_engine.pool.checkedin(),
+            checked_out=status_engine.pool.checkedout(),
+            overflow=status_engine.pool.overflow(),
+        )
+    return status
+
+
+def get_pool_status():
+    """Current pool occupancy plus cumulative checkout/wait counters of each engine."""
+    status = {"sync": _engine_status(engine, pool_metrics)}
+    if _async_engine is not None:
+        status["async"] = _engine_status(_async_engine.sync_engine, async_pool_metrics)
+    return status
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -22,6 +250,11 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 @contextmanager
 def get_db_context():
     db = SessionLocal()
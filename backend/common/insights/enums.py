@@ -9,3 +9,9 @@ class InsightType(str, Enum):
 class HabitType(str, Enum):
     SCORE = "score"
     BOOLEAN = "boolean"
+
+
+class SeriesBucket(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
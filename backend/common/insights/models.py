@@ -37,6 +37,28 @@ class DailyInsight(Base):
         return f"<DailyInsight(id={self.id}, date='{self.date}', type='{self.type}')>"
 
 
+class DailyInsightRollup(Base):
+    """Weekly and monthly score averages, maintained by a trigger on daily_insights."""
+
+    __tablename__ = "daily_insights_rollup"
+
+    period = Column(String(5), primary_key=True)  # 'week' | 'month'
+    type = Column(String(3), primary_key=True)
+    period_start = Column(Date, primary_key=True)
+    insights = Column(Integer, nullable=False)
+    focus_score = Column(Numeric)
+    productivity_score = Column(Numeric)
+    sentiment_score = Column(Numeric)
+    general_score = Column(Numeric)
+    updated_at = Column(DateTime, default=func.now())
+
+    def __repr__(self):
+        return (
+            f"<DailyInsightRollup(period='{self.period}', type='{self.type}', "
+            f"period_start='{self.period_start}')>"
+        )
+
+
 class Habit(Base):
     __tablename__ = "habit"
 
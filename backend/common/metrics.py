@@ -0,0 +1,150 @@
+import bisect
+import functools
+import threading
+import time
+
+# Seconds, the default buckets of the Prometheus client libraries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    pairs = (f'{name}="{str(value)}"' for name, value in zip(names, values))
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    """Monotonic counter per combination of label values."""
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    """Bucketed observations per combination of label values."""
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._values = {}
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(label_values) or ([0] * (len(self.buckets) + 1), 0)
+            counts[index] += 1
+            self._values[label_values] = (counts, total + value)
+
+    def time(self, *label_values):
+        """Decorator observing the duration of each call."""
+
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start, *label_values)
+
+            return wrapper
+
+        return decorator
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        label_names = self.labels + ("le",)
+        with self._lock:
+            for label_values, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += count
+                    labels = _label_text(label_names, label_values + (bound,))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _label_text(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# Per process: with several workers each one exposes its own values
+http_requests = Counter(
+    "http_requests_total", "HTTP requests handled.", ("app", "method", "route", "status")
+)
+http_request_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("app", "method", "route")
+)
+db_query_seconds = Histogram(
+    "db_query_duration_seconds",
+    "Database statement latency.",
+    ("engine",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+recommendation_seconds = Histogram(
+    "recommendation_duration_seconds", "Task scoring and recommendation latency.", ("function",)
+)
+proxy_upstream_seconds = Histogram(
+    "api_proxy_upstream_duration_seconds",
+    "Latency of the FastAPI backend as seen by the Flask proxy.",
+    ("transport", "status"),
+)
+
+METRICS = (
+    http_requests,
+    http_request_seconds,
+    db_query_seconds,
+    recommendation_seconds,
+    proxy_upstream_seconds,
+)
+
+
+def _pool_lines(pool_status):
+    lines = []
+    gauges = ("size", "checked_in", "checked_out", "overflow")
+    counters = ("connects", "checkouts", "invalidations", "wait_seconds_total")
+    for name in gauges:
+        lines += [f"# TYPE db_pool_{name} gauge"]
+        lines += [
+            f'db_pool_{name}{{engine="{engine}"}} {status[name]}'
+            for engine, status in pool_status.items()
+            if name in status
+        ]
+    for name in counters:
+        metric = name if name.endswith("_total") else f"{name}_total"
+        lines += [f"# TYPE db_pool_{metric} counter"]
+        lines += [
+            f'db_pool_{metric}{{engine="{engine}"}} {status[name]}'
+            for engine, status in pool_status.items()
+        ]
+    return lines
+
+
+def render_metrics(pool_status=None) -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    if pool_status:
+        lines += _pool_lines(pool_status)
+    return "\n".join(lines) + "\n"
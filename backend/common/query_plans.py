@@ -0,0 +1,92 @@
+import sys
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from .tasks.enums import TaskState
+from .tasks.models import Note, Task, TaskPlanning
+
+# Hot queries and the index each of them must be able to use. Run after a migration with
+# `python -m common.query_plans` from /backend; it exits with 1 when a plan regresses.
+# tests/test_query_plans.py runs the same check with the test suite.
+
+
+def hot_queries(today: date) -> Dict[str, tuple]:
+    next_week = today + timedelta(days=7)
+    return {
+        "calendar range": (
+            select(TaskPlanning).where(
+                TaskPlanning.planned_date >= today - timedelta(days=1),
+                TaskPlanning.planned_date <= today + timedelta(days=10),
+            ),
+            "idx_task_planning_planned_date_task_id",
+        ),
+        "nearest future planning": (
+            select(TaskPlanning.task_id, func.min(TaskPlanning.planned_date))
+            .where(TaskPlanning.task_id.in_([1, 2, 3]), TaskPlanning.planned_date >= today)
+            .group_by(TaskPlanning.task_id),
+            "idx_task_planning_task_id_planned_date",
+        ),
+        "general info plannings": (
+            select(TaskPlanning).where(
+                TaskPlanning.task_id == 1,
+                TaskPlanning.planned_date >= today,
+                TaskPlanning.planned_date <= next_week,
+            ),
+            "idx_task_planning_task_id_planned_date",
+        ),
+        "general info notes": (
+            select(Note).where(Note.task_id == 1).order_by(Note.updated_at.desc()).limit(5),
+            "idx_note_task_id_updated_at",
+        ),
+        "project tasks": (
+            select(Task).where(Task.project_id == 1),
+            "idx_task_project_id",
+        ),
+        "open project tasks": (
+            select(Task).where(
+                Task.project_id == 1,
+                Task.state.in_([TaskState.PENDING, TaskState.IN_PROGRESS]),
+            ),
+            "idx_task_open_project_id",
+        ),
+    }
+
+
+def _index_names(plan: dict) -> Iterator[str]:
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", []):
+        yield from _index_names(child)
+
+
+def check_query_plans(db: Session) -> List[str]:
+    """EXPLAIN every hot query and return the ones whose plan skips their index.
+
+    Sequential scans are disabled for the check, so tiny development tables still show
+    whether an index is usable at all.
+    """
+    failures = []
+    dialect = db.get_bind().dialect
+    with db.begin():
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+        for name, (statement, index) in hot_queries(date.today()).items():
+            compiled = statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+            plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()[0]["Plan"]
+            if index not in set(_index_names(plan)):
+                failures.append(f"{name}: expected {index}")
+    return failures
+
+
+if __name__ == "__main__":
+    from .database import SessionLocal
+
+    with SessionLocal() as db:
+        failures = check_query_plans(db)
+    for failure in failures:
+        print(f"Query plan regression - {failure}")
+    if failures:
+        sys.exit(1)
+    print("All hot queries use their indexes.")
@@ -0,0 +1,97 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from .metrics import db_query_seconds
+
+QUERY_COUNT_HEADER = "X-DB-Queries"
+QUERY_TIME_HEADER = "X-DB-Time-Ms"
+
+
+class QueryStats:
+    """Statements run and time spent in the database during one request."""
+
+    def __init__(self, route: Optional[str] = None):
+        self.route = route
+        self.count = 0
+        self.seconds = 0.0
+
+    @property
+    def milliseconds(self) -> float:
+        return self.seconds * 1000
+
+    def headers(self) -> dict:
+        return {
+            QUERY_COUNT_HEADER: str(self.count),
+            QUERY_TIME_HEADER: f"{self.milliseconds:.2f}",
+            "Server-Timing": f'db;dur={self.milliseconds:.2f};desc="{self.count} queries"',
+        }
+
+    def log_fields(self) -> dict:
+        # For the `extra` argument of a logging call
+        return {"db_queries": self.count, "db_time_ms": round(self.milliseconds, 2)}
+
+
+# Holds a mutable QueryStats, so statements run in copied contexts (tasks, greenlets) add to it
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def track_queries(sync_engine, engine_name: str):
+    """Time every statement of `sync_engine`, adding it to the current request's QueryStats."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def record_query(conn, cursor, statement, parameters, context, executemany):
+        if not conn.info.get("query_start"):
+            return
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        db_query_seconds.observe(seconds, engine_name)
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+
+    @event.listens_for(sync_engine, "handle_error")
+    def discard_timer(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+
+def start_query_stats(route: Optional[str] = None) -> QueryStats:
+    stats = QueryStats(route)
+    _current_stats.set(stats)
+    return stats
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def count_queries():
+    """Collect the QueryStats of the statements run inside the block."""
+    token = _current_stats.set(QueryStats())
+    try:
+        yield _current_stats.get()
+    finally:
+        _current_stats.reset(token)
+
+
+def assert_no_n_plus_one(fetch, sizes=(1, 10, 50)):
+    """Test helper: fail when an endpoint runs more statements for more rows.
+
+    `fetch(n)` requests the endpoint so that it returns `n` rows, for instance through a
+    `?limit=n` parameter, and returns the response. Statements are counted from its
+    QUERY_COUNT_HEADER, set by both apps.
+    """
+    counts = {size: int(fetch(size).headers[QUERY_COUNT_HEADER]) for size in sizes}
+    if len(set(counts.values())) > 1:
+        per_size = ", ".join(f"{size} rows: {count}" for size, count in counts.items())
+        raise AssertionError(f"Query count grows with the rows returned ({per_size})")
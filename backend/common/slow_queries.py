@@ -0,0 +1,95 @@
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+
+from .query_stats import current_query_stats
+
+logger = logging.getLogger(__name__)
+
+MAX_LOGGED_PARAMETERS = 500  # characters of the parameters' repr kept in the log
+
+
+class SlowQueryLog:
+    """Logs statements slower than `threshold_ms` with their duration and request route.
+
+    A `explain_sample` fraction of the slow SELECT statements is explained on the same
+    connection, and the plan is appended as a JSON line to `explain_file`. It is a plain
+    EXPLAIN, without ANALYZE: the statement is planned but not run again, so locks taken
+    by FOR UPDATE, sequences and volatile functions are not touched a second time. The
+    plan has the estimates only; the measured time is the logged duration.
+    """
+
+    def __init__(self, threshold_ms, explain_sample=0.0, explain_file=None):
+        self.threshold_ms = threshold_ms
+        self.explain_sample = explain_sample
+        self.explain_file = explain_file
+        self._file_lock = threading.Lock()
+
+    def track(self, sync_engine):
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def start_timer(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def check_duration(conn, cursor, statement, parameters, context, executemany):
+            if not conn.info.get("slow_query_start"):
+                return
+            milliseconds = (time.perf_counter() - conn.info["slow_query_start"].pop()) * 1000
+            if milliseconds >= self.threshold_ms:
+                self._record(conn, statement, parameters, milliseconds, executemany)
+
+        @event.listens_for(sync_engine, "handle_error")
+        def discard_timer(exception_context):
+            connection = exception_context.connection
+            if connection is not None and connection.info.get("slow_query_start"):
+                connection.info["slow_query_start"].pop()
+
+    def _record(self, conn, statement, parameters, milliseconds, executemany):
+        stats = current_query_stats()
+        route = stats.route if stats is not None else None
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s; parameters: %s",
+            milliseconds,
+            route or "no request",
+            statement,
+            repr(parameters)[:MAX_LOGGED_PARAMETERS],
+            extra={"db_time_ms": round(milliseconds, 2), "route": route},
+        )
+        if (
+            self.explain_file
+            and not executemany
+            and statement.lstrip()[:6].upper() == "SELECT"
+            and random.random() < self.explain_sample
+        ):
+            self._explain(conn, statement, parameters, milliseconds, route)
+
+    def _explain(self, conn, statement, parameters, milliseconds, route):
+        cursor = conn.connection.cursor()
+        try:
+            # A failed EXPLAIN must not abort the request's transaction
+            cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+                plan = cursor.fetchone()[0]
+            except Exception:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                logger.exception("Could not explain slow query")
+                return
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        finally:
+            cursor.close()
+        entry = {
+            "logged_at": datetime.utcnow().isoformat(),
+            "route": route,
+            "duration_ms": round(milliseconds, 2),
+            "statement": statement,
+            "parameters": repr(parameters)[:MAX_LOGGED_PARAMETERS],
+            "plan": json.loads(plan) if isinstance(plan, str) else plan,
+        }
+        with self._file_lock, open(self.explain_file, "a") as explain_file:
+            explain_file.write(json.dumps(entry, default=str) + "\n")
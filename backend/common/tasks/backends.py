@@ -0,0 +1,32 @@
+import os
+from typing import Callable
+
+from .batch_scoring import get_task_recommendations_batch
+from .recommendations import get_task_recommendations
+from .score_store import get_stored_task_recommendations
+from .sql_scoring import get_task_recommendations_sql
+
+# Implementations behind GET /tasks/recommendations, all taking (db, limit, for_planning)
+# and returning [{"task": Task, "score": float}] best first:
+#   stored - top-N read from the materialized task_score table (default)
+#   python - score_task over the loaded ORM tasks, the reference implementation
+#   batch  - the columnar NumPy path over flat arrays of scoring inputs
+#   sql    - scored and ranked by PostgreSQL, only the top rows are returned
+RECOMMENDATION_BACKENDS = {
+    "stored": get_stored_task_recommendations,
+    "python": get_task_recommendations,
+    "batch": get_task_recommendations_batch,
+    "sql": get_task_recommendations_sql,
+}
+
+RECOMMENDATION_BACKEND = os.getenv("RECOMMENDATION_BACKEND", "stored")
+if RECOMMENDATION_BACKEND not in RECOMMENDATION_BACKENDS:
+    raise RuntimeError(
+        f"RECOMMENDATION_BACKEND must be one of {', '.join(RECOMMENDATION_BACKENDS)}, "
+        f"not {RECOMMENDATION_BACKEND!r}"
+    )
+
+
+def recommendation_backend() -> Callable:
+    """The recommendation function selected by RECOMMENDATION_BACKEND."""
+    return RECOMMENDATION_BACKENDS[RECOMMENDATION_BACKEND]
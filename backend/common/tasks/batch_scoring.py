@@ -0,0 +1,149 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.orm import Session
+
+from .enums import ProjectState, TaskState
+from .models import Project, Task, TaskPlanning
+from .recommendations import SCORE_WEIGHTS, TIME_CONSTANTS
+
+# Columnar twin of recommendations.score_task: every term is computed over flat arrays.
+# Dates are loaded as day offsets from today (NaN when NULL) so no Python date math is needed.
+
+
+def load_scoring_columns(db: Session, today: date, *criteria) -> Dict[str, np.ndarray]:
+    """Load the scoring inputs of every open task of an in-progress project in one query.
+
+    Extra SQL `criteria` narrow the candidate set, e.g. to the tasks touched by a write.
+    """
+    nearest_planning = (
+        select(
+            TaskPlanning.task_id,
+            func.min(TaskPlanning.planned_date).label("planned_date"),
+        )
+        .where(TaskPlanning.planned_date >= today)
+        .group_by(TaskPlanning.task_id)
+        .subquery()
+    )
+    query = (
+        db.query(
+            Task.id,
+            Task.priority,
+            Task.due_date - today,
+            Task.state == TaskState.IN_PROGRESS,
+            Task.state == TaskState.PENDING,
+            today - cast(Task.created_at, Date),
+            Project.priority,
+            nearest_planning.c.planned_date - today,
+        )
+        .join(Project, Task.project_id == Project.id)
+        .outerjoin(nearest_planning, nearest_planning.c.task_id == Task.id)
+        .filter(
+            Project.state == ProjectState.IN_PROGRESS,
+            Task.state.in_([TaskState.PENDING, TaskState.IN_PROGRESS]),
+            *criteria,
+        )
+    )
+    rows = query.all()
+
+    names = (
+        "id",
+        "priority",
+        "due_in",
+        "in_progress",
+        "pending",
+        "age",
+        "project_priority",
+        "planned_in",
+    )
+    if not rows:
+        return {name: np.empty(0, dtype=float) for name in names}
+    columns = dict(zip(names, (np.array(values, dtype=float) for values in zip(*rows))))
+    columns["id"] = columns["id"].astype(np.int64)
+    return columns
+
+
+def score_columns(columns: Dict[str, np.ndarray], for_planning: bool = False) -> np.ndarray:
+    """Score every row of `columns`; tasks excluded from planning get NaN."""
+    due_in = columns["due_in"]
+    planned_in = columns["planned_in"]
+    has_due_date = ~np.isnan(due_in)
+
+    score = np.nan_to_num(columns["priority"]) * SCORE_WEIGHTS["priority_multiplier"]
+
+    with np.errstate(invalid="ignore"):
+        overdue = has_due_date & (due_in < 0)
+        upcoming = has_due_date & (due_in >= 0) & (due_in <= TIME_CONSTANTS["upcoming_days"])
+        future = has_due_date & (due_in > TIME_CONSTANTS["upcoming_days"])
+    score += np.select(
+        [overdue, upcoming, future],
+        [
+            SCORE_WEIGHTS["overdue_base"] + np.abs(due_in),
+            SCORE_WEIGHTS["upcoming_base"] - due_in * SCORE_WEIGHTS["upcoming_penalty"],
+            np.maximum(0, SCORE_WEIGHTS["future_base"] - due_in / SCORE_WEIGHTS["future_decay"]),
+        ],
+        default=0.0,
+    )
+
+    in_progress = columns["in_progress"] == 1
+    pending = columns["pending"] == 1
+    if for_planning:
+        # The nearest future planning decides both the window exclusion and the valid plan check
+        with np.errstate(invalid="ignore"):
+            excluded = planned_in < TIME_CONSTANTS["planning_window_days"]
+            has_valid_plan = ~np.isnan(planned_in) & (~has_due_date | (planned_in <= due_in))
+        score += np.where(has_valid_plan, 0, SCORE_WEIGHTS["no_future_plans_bonus"])
+        score += np.where(in_progress, SCORE_WEIGHTS["in_progress_planning"], 0)
+        score += np.where(pending, SCORE_WEIGHTS["pending_planning"], 0)
+    else:
+        score += np.where(in_progress, SCORE_WEIGHTS["in_progress_basic"], 0)
+        score += np.where(pending, SCORE_WEIGHTS["pending_basic"], 0)
+
+    age = columns["age"]
+    score += np.where(
+        np.isnan(age),
+        0,
+        np.minimum(SCORE_WEIGHTS["age_limit"], age * SCORE_WEIGHTS["age_multiplier"]),
+    )
+
+    project_priority = np.where(
+        np.isnan(columns["project_priority"]), 1, columns["project_priority"]
+    )
+    score *= project_priority * 0.3
+
+    if for_planning:
+        score[excluded] = np.nan
+    return score
+
+
+def top_n_indices(scores: np.ndarray, limit: Optional[int] = None) -> np.ndarray:
+    """Indices of the highest non-NaN scores, best first, ties kept in load order."""
+    candidates = np.flatnonzero(~np.isnan(scores))
+    if limit and limit < len(candidates):
+        # Partial sort: only the kth boundary is placed, the head is sorted afterwards
+        kth = np.argpartition(-scores[candidates], limit - 1)[:limit]
+        boundary = scores[candidates[kth]].min()
+        candidates = candidates[scores[candidates] >= boundary]
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:limit] if limit else candidates[order]
+
+
+def get_task_recommendations_batch(
+    db: Session, limit: int = None, for_planning: bool = False
+) -> List[Dict[str, Any]]:
+    """Same output as get_task_recommendations, scored column-wise over the whole backlog."""
+    today = datetime.now().date()
+
+    columns = load_scoring_columns(db, today)
+    scores = score_columns(columns, for_planning)
+    best = top_n_indices(scores, limit)
+
+    # Only the selected tasks are materialized as ORM objects
+    task_ids = columns["id"][best].tolist()
+    tasks = {task.id: task for task in db.query(Task).filter(Task.id.in_(task_ids))}
+    return [
+        {"task": tasks[task_id], "score": float(score)}
+        for task_id, score in zip(task_ids, scores[best])
+    ]
@@ -4,13 +4,15 @@ from sqlalchemy import (
     Column,
     Date,
     DateTime,
+    Float,
     ForeignKey,
     Integer,
     String,
     Text,
     Time,
+    select,
 )
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import column_property, declarative_base, relationship
 from sqlalchemy.sql import func
 
 from .enums import ProjectState, TaskState
@@ -58,10 +60,6 @@ class Project(Base):
     # One-to-many relationship with Note
     notes = relationship("Note", back_populates="project", cascade="all, delete-orphan")
 
-    @property
-    def pending_tasks_count(self):
-        return len([task for task in self.tasks if task.state in ["pending", "in_progress"]])
-
     def __repr__(self):
         return f"<Project(id={self.id}, name='{self.name}', state='{self.state}')>"
 
@@ -89,6 +87,20 @@ class Task(Base):
         return f"<Task(id={self.id}, title='{self.title}', state='{self.state}')>"
 
 
+# Counted by PostgreSQL over the open-task index, deferred: load it with
+# `undefer(Project.pending_tasks_count)` to get it in the same query as the projects
+Project.pending_tasks_count = column_property(
+    select(func.count(Task.id))
+    .where(
+        Task.project_id == Project.id,
+        Task.state.in_([TaskState.PENDING.value, TaskState.IN_PROGRESS.value]),
+    )
+    .correlate_except(Task)
+    .scalar_subquery(),
+    deferred=True,
+)
+
+
 class TaskPlanning(Base):
     __tablename__ = "task_planning"
 
@@ -144,3 +156,28 @@ class Note(Base):
             f"<Note(id={self.id}, content='{self.content[:20]}...', "
             f"project_id={self.project_id}, task_id={self.task_id})>"
         )
+
+
+class TaskScore(Base):
+    __tablename__ = "task_score"
+
+    # Materialized recommendation scores, maintained by common.tasks.score_store
+    task_id = Column(Integer, ForeignKey("task.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False)
+    # NULL when the task is already planned inside the planning window
+    planning_score = Column(Float)
+    scored_on = Column(Date, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    task = relationship("Task")
+
+    def __repr__(self):
+        return f"<TaskScore(task_id={self.task_id}, score={self.score})>"
+
+
+class TaskScoreRefresh(Base):
+    __tablename__ = "task_score_refresh"
+
+    # Single row: the date task_score was last fully rebuilt
+    id = Column(Boolean, primary_key=True, default=True)
+    refreshed_on = Column(Date, nullable=False)
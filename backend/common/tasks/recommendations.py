@@ -1,8 +1,10 @@
-from datetime import datetime, timedelta
-from typing import Any, Dict, List
+import heapq
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
+from ..metrics import recommendation_seconds
 from .enums import ProjectState, TaskState
 from .models import Project, Task, TaskPlanning
 
@@ -29,29 +31,100 @@ TIME_CONSTANTS = {
     "planning_window_days": 4,
 }
 
+# Minimum number of candidates whose plannings are fetched per query in top-N selection
+PLANNING_FETCH_CHUNK = 50
 
-def get_task_recommendations(
-    db: Session, limit: int = None, for_planning: bool = False
-) -> List[Dict[str, Any]]:
-    today = datetime.now().date()
 
-    # Retrieve IDs of projects that are currently in progress
-    in_progress_projects = (
-        db.query(Project.id).filter(Project.state == ProjectState.IN_PROGRESS).subquery()
-    )
+def score_task(
+    task: Task, plannings: List[TaskPlanning], today: date, for_planning: bool = False
+) -> Optional[float]:
+    """Score a single task, or return None when it is excluded from planning.
 
-    # Fetch tasks from in-progress projects that are pending or in progress
-    tasks = (
-        db.query(Task)
-        .filter(
-            Task.project_id.in_(in_progress_projects),
-            Task.state.in_([TaskState.PENDING, TaskState.IN_PROGRESS]),
+    `plannings` must contain the task's plannings from `today` onwards.
+    """
+    # --- Skip tasks that are already planned in the near future when planning ---
+    if for_planning:
+        has_near_term_plan = any(
+            p.planned_date < today + timedelta(days=TIME_CONSTANTS["planning_window_days"])
+            for p in plannings
         )
-        .all()
+
+        # Skip this task if it's already planned within the planning window
+        if has_near_term_plan:
+            return None
+
+    score = 0.0
+
+    # Calculate priority score
+    if task.priority is not None:
+        score += task.priority * SCORE_WEIGHTS["priority_multiplier"]
+
+    # Calculate due date score
+    if task.due_date:
+        delta_days = (task.due_date - today).days
+        if delta_days < 0:
+            score += SCORE_WEIGHTS["overdue_base"] + abs(delta_days)
+        elif delta_days <= TIME_CONSTANTS["upcoming_days"]:
+            score += SCORE_WEIGHTS["upcoming_base"] - delta_days * SCORE_WEIGHTS["upcoming_penalty"]
+        else:
+            score += max(
+                0, SCORE_WEIGHTS["future_base"] - delta_days / SCORE_WEIGHTS["future_decay"]
+            )
+
+    # --- Dynamic Scoring based on `for_planning` flag ---
+    if for_planning:
+        # Check for plannings that are after the due date
+        has_valid_plan = False
+        for planning in plannings:
+            if task.due_date is None or planning.planned_date <= task.due_date:
+                has_valid_plan = True
+                break
+
+        if not has_valid_plan:
+            score += SCORE_WEIGHTS["no_future_plans_bonus"]
+
+        # Simplified task state score since we already filtered out near-term planned tasks
+        if task.state == TaskState.IN_PROGRESS:
+            score += SCORE_WEIGHTS["in_progress_planning"]
+        elif task.state == TaskState.PENDING:
+            score += SCORE_WEIGHTS["pending_planning"]
+
+    else:
+        # Basic task state score
+        if task.state == TaskState.IN_PROGRESS:
+            score += SCORE_WEIGHTS["in_progress_basic"]
+        elif task.state == TaskState.PENDING:
+            score += SCORE_WEIGHTS["pending_basic"]
+
+    # --- Age-related scoring ---
+    if task.created_at:
+        age_days = (today - task.created_at.date()).days
+        score += min(SCORE_WEIGHTS["age_limit"], age_days * SCORE_WEIGHTS["age_multiplier"])
+
+    # --- Apply project priority as a global multiplier ---
+    project_priority = 1
+    if task.project and task.project.priority is not None:
+        project_priority = task.project.priority
+    score *= project_priority * 0.3
+
+    return score
+
+
+def open_tasks_query(db: Session):
+    """Query for the pending or in-progress tasks of in-progress projects."""
+    # Retrieve IDs of projects that are currently in progress
+    in_progress_projects = db.query(Project.id).filter(Project.state == ProjectState.IN_PROGRESS)
+
+    return db.query(Task).filter(
+        Task.project_id.in_(in_progress_projects),
+        Task.state.in_([TaskState.PENDING, TaskState.IN_PROGRESS]),
     )
 
-    # --- Pre-fetch all relevant plannings to avoid N+1 queries ---
-    task_ids = [t.id for t in tasks]
+
+def future_plannings_by_task(
+    db: Session, task_ids: List[int], today: date
+) -> Dict[int, List[TaskPlanning]]:
+    """Pre-fetch the plannings from `today` onwards of the given tasks in one query."""
     future_plannings = (
         db.query(TaskPlanning)
         .filter(TaskPlanning.task_id.in_(task_ids), TaskPlanning.planned_date >= today)
@@ -62,86 +135,97 @@ def get_task_recommendations(
     plannings_by_task = {}
     for planning in future_plannings:
         plannings_by_task.setdefault(planning.task_id, []).append(planning)
+    return plannings_by_task
 
-    recommendations = []
-    for task in tasks:
-        # --- Skip tasks that are already planned in the near future when planning ---
-        if for_planning:
-            current_plannings = plannings_by_task.get(task.id, [])
-            has_near_term_plan = any(
-                p.planned_date < today + timedelta(days=TIME_CONSTANTS["planning_window_days"])
-                for p in current_plannings
-            )
 
-            # Skip this task if it's already planned within the planning window
-            if has_near_term_plan:
+def _top_recommendations(
+    db: Session,
+    tasks: List[Task],
+    today: date,
+    limit: int,
+    for_planning: bool,
+    plannings_by_task: Optional[Dict[int, List[TaskPlanning]]] = None,
+) -> List[Dict[str, Any]]:
+    """Bounded-heap selection of the best `limit` tasks.
+
+    Plannings can only remove the planning bonus or exclude a task, so the score computed
+    without them is an upper bound. Tasks are visited by decreasing bound, plannings are
+    fetched per chunk unless already given, and the scan stops once no remaining bound can
+    enter the heap.
+    """
+    bounds = [score_task(task, [], today, for_planning) for task in tasks]
+    if not for_planning:
+        # Without planning terms the bound is the exact score
+        best = heapq.nlargest(limit, range(len(tasks)), key=bounds.__getitem__)
+        return [{"task": tasks[i], "score": bounds[i]} for i in best]
+
+    # Min-heap of (score, -index): the root is the weakest kept candidate, later index on ties
+    heap = []
+    order = sorted(range(len(tasks)), key=lambda i: bounds[i], reverse=True)
+    chunk_size = max(limit * 2, PLANNING_FETCH_CHUNK)
+    for start in range(0, len(order), chunk_size):
+        chunk = order[start : start + chunk_size]
+        if len(heap) == limit and bounds[chunk[0]] < heap[0][0]:
+            break
+        chunk_plannings = plannings_by_task
+        if chunk_plannings is None:
+            chunk_plannings = future_plannings_by_task(db, [tasks[i].id for i in chunk], today)
+        for i in chunk:
+            if len(heap) == limit and bounds[i] < heap[0][0]:
+                break
+            score = score_task(tasks[i], chunk_plannings.get(tasks[i].id, []), today, True)
+            if score is None:
                 continue
+            if len(heap) < limit:
+                heapq.heappush(heap, (score, -i))
+            elif (score, -i) > heap[0]:
+                heapq.heapreplace(heap, (score, -i))
 
-        score = 0.0
-
-        # Calculate priority score
-        if task.priority is not None:
-            score += task.priority * SCORE_WEIGHTS["priority_multiplier"]
-
-        # Remove the previous project priority addition, as it will now be a multiplier
-        # if task.project and task.project.priority is not None:
-        #     score += task.project.priority * SCORE_WEIGHTS["priority_multiplier"] * 2
-
-        # Calculate due date score
-        if task.due_date:
-            delta_days = (task.due_date - today).days
-            if delta_days < 0:
-                score += SCORE_WEIGHTS["overdue_base"] + abs(delta_days)
-            elif delta_days <= TIME_CONSTANTS["upcoming_days"]:
-                score += (
-                    SCORE_WEIGHTS["upcoming_base"] - delta_days * SCORE_WEIGHTS["upcoming_penalty"]
-                )
-            else:
-                score += max(
-                    0, SCORE_WEIGHTS["future_base"] - delta_days / SCORE_WEIGHTS["future_decay"]
-                )
-
-        # --- Dynamic Scoring based on `for_planning` flag ---
-        if for_planning:
-            # Get pre-fetched plannings for this task
-            current_plannings = plannings_by_task.get(task.id, [])
+    heap.sort(reverse=True)
+    return [{"task": tasks[-i], "score": score} for score, i in heap]
+
+
+@recommendation_seconds.time("get_task_recommendations")
+def get_task_recommendations(
+    db: Session,
+    limit: int = None,
+    for_planning: bool = False,
+    tasks: Optional[List[Task]] = None,
+    task_ids: Optional[Iterable[int]] = None,
+    plannings_by_task: Optional[Dict[int, List[TaskPlanning]]] = None,
+) -> List[Dict[str, Any]]:
+    """Score and rank the open tasks, or only the given subset of them.
 
-            # Check for plannings that are after the due date
-            has_valid_plan = False
-            for planning in current_plannings:
-                if task.due_date is None or planning.planned_date <= task.due_date:
-                    has_valid_plan = True
-                    break
+    `tasks` are scored as given, so callers that already loaded what they display avoid a
+    second load; their project should be loaded too. Otherwise the open tasks are loaded,
+    restricted to `task_ids` when given. `plannings_by_task` replaces the planning
+    pre-fetch of `for_planning` and must hold the tasks' plannings from today onwards.
+    """
+    today = datetime.now().date()
 
-            if not has_valid_plan:
-                score += SCORE_WEIGHTS["no_future_plans_bonus"]
+    if tasks is None:
+        # Fetch tasks from in-progress projects that are pending or in progress
+        query = open_tasks_query(db).options(selectinload(Task.project))
+        if task_ids is not None:
+            query = query.filter(Task.id.in_(list(task_ids)))
+        tasks = query.all()
 
-            # Simplified task state score since we already filtered out near-term planned tasks
-            if task.state == TaskState.IN_PROGRESS:
-                score += SCORE_WEIGHTS["in_progress_planning"]
-            elif task.state == TaskState.PENDING:
-                score += SCORE_WEIGHTS["pending_planning"]
+    if limit:
+        return _top_recommendations(db, tasks, today, limit, for_planning, plannings_by_task)
 
-        else:
-            # Basic task state score
-            if task.state == TaskState.IN_PROGRESS:
-                score += SCORE_WEIGHTS["in_progress_basic"]
-            elif task.state == TaskState.PENDING:
-                score += SCORE_WEIGHTS["pending_basic"]
-
-        # --- Age-related scoring ---
-        if task.created_at:
-            age_days = (today - task.created_at.date()).days
-            score += min(SCORE_WEIGHTS["age_limit"], age_days * SCORE_WEIGHTS["age_multiplier"])
-
-        # --- Apply project priority as a global multiplier ---
-        project_priority = 1
-        if task.project and task.project.priority is not None:
-            project_priority = task.project.priority
-        score *= project_priority * 0.3
+    # --- Pre-fetch all relevant plannings to avoid N+1 queries ---
+    if plannings_by_task is None:
+        plannings_by_task = {}
+        if for_planning:
+            plannings_by_task = future_plannings_by_task(db, [t.id for t in tasks], today)
 
+    recommendations = []
+    for task in tasks:
+        score = score_task(task, plannings_by_task.get(task.id, []), today, for_planning)
+        if score is None:
+            continue
         recommendations.append({"task": task, "score": score})
 
     # Sort and return
     recommendations.sort(key=lambda r: r["score"], reverse=True)
-    return recommendations[:limit] if limit else recommendations
+    return recommendations
@@ -0,0 +1,197 @@
+from datetime import datetime
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, event, func, inspect, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..metrics import recommendation_seconds
+from .batch_scoring import load_scoring_columns, score_columns
+from .models import Project, Task, TaskPlanning, TaskScore, TaskScoreRefresh
+
+# Session.info key holding the task/project IDs whose scores must be refreshed on commit
+PENDING_SCORE_CHANGES = "pending_score_changes"
+# Transaction-level advisory lock serializing the daily rebuild between processes
+SCORE_REFRESH_LOCK_ID = 0x7461736B
+
+# Only writes made through sessions registered with track_task_score_changes rescore their
+# tasks right away. Rows edited elsewhere (SQL, the Supabase dashboard, other clients) keep
+# their scores until the next daily rebuild; run `python -m common.tasks.score_store` from
+# /backend to rebuild them at any time, for instance from a nightly scheduled job.
+
+
+@recommendation_seconds.time("refresh_task_scores")
+def refresh_task_scores(
+    db: Session,
+    task_ids: Optional[Iterable[int]] = None,
+    project_ids: Optional[Iterable[int]] = None,
+) -> None:
+    """Recompute the stored scores of the given tasks and projects' tasks.
+
+    Without arguments every stored score is rebuilt. The caller owns the transaction.
+    """
+    full_refresh = task_ids is None and project_ids is None
+    task_ids = set(task_ids or [])
+    project_ids = set(project_ids or [])
+    if not full_refresh and not task_ids and not project_ids:
+        return
+
+    today = datetime.now().date()
+
+    criteria = []
+    stale_scores = delete(TaskScore)
+    if not full_refresh:
+        in_scope = or_(Task.id.in_(task_ids), Task.project_id.in_(project_ids))
+        criteria.append(in_scope)
+        stale_scores = stale_scores.where(TaskScore.task_id.in_(select(Task.id).where(in_scope)))
+
+    columns = load_scoring_columns(db, today, *criteria)
+    scores = score_columns(columns)
+    planning_scores = score_columns(columns, for_planning=True)
+
+    rows = [
+        {
+            "task_id": task_id,
+            "score": score,
+            "planning_score": None if np.isnan(planning_score) else planning_score,
+            "scored_on": today,
+        }
+        for task_id, score, planning_score in zip(
+            columns["id"].tolist(), scores.tolist(), planning_scores.tolist()
+        )
+    ]
+
+    # Drop rows of tasks that left the candidate set, then upsert the rest
+    db.execute(stale_scores)
+    if rows:
+        statement = insert(TaskScore).values(rows)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[TaskScore.task_id],
+                set_={
+                    "score": statement.excluded.score,
+                    "planning_score": statement.excluded.planning_score,
+                    "scored_on": statement.excluded.scored_on,
+                },
+            )
+        )
+    if full_refresh:
+        marker = insert(TaskScoreRefresh).values(id=True, refreshed_on=today)
+        db.execute(
+            marker.on_conflict_do_update(
+                index_elements=[TaskScoreRefresh.id],
+                set_={"refreshed_on": marker.excluded.refreshed_on},
+            )
+        )
+
+
+def mark_scores_dirty(
+    db: Session,
+    task_ids: Iterable[int] = (),
+    project_ids: Iterable[int] = (),
+) -> None:
+    """Queue a score refresh for writes that bypass the ORM unit of work."""
+    pending = db.info.setdefault(PENDING_SCORE_CHANGES, {"tasks": set(), "projects": set()})
+    pending["tasks"].update(task_ids)
+    pending["projects"].update(project_ids)
+
+
+def _collect_score_changes(db: Session, flush_context) -> None:
+    task_ids = set()
+    project_ids = set()
+    for obj in chain(db.new, db.dirty, db.deleted):
+        if isinstance(obj, Task):
+            task_ids.add(obj.id)
+        elif isinstance(obj, TaskPlanning):
+            task_ids.add(obj.task_id)
+            # A planning moved to another task also changes the previous task's score
+            task_ids.update(inspect(obj).attrs.task_id.history.deleted or [])
+        elif isinstance(obj, Project):
+            project_ids.add(obj.id)
+    task_ids.discard(None)
+    project_ids.discard(None)
+    if task_ids or project_ids:
+        mark_scores_dirty(db, task_ids, project_ids)
+
+
+def _refresh_pending_scores(db: Session) -> None:
+    db.flush()
+    pending = db.info.pop(PENDING_SCORE_CHANGES, None)
+    if pending:
+        refresh_task_scores(db, pending["tasks"], pending["projects"])
+
+
+def _discard_pending_scores(db: Session, previous_transaction) -> None:
+    db.info.pop(PENDING_SCORE_CHANGES, None)
+
+
+def track_task_score_changes(session_factory) -> None:
+    """Keep `task_score` in sync with task, planning and project writes of a session factory.
+
+    Registering a factory again is a no-op, as when the Flask app imports the FastAPI one.
+    """
+    if event.contains(session_factory, "after_flush", _collect_score_changes):
+        return
+    event.listen(session_factory, "after_flush", _collect_score_changes)
+    event.listen(session_factory, "before_commit", _refresh_pending_scores)
+    event.listen(session_factory, "after_soft_rollback", _discard_pending_scores)
+
+
+def refresh_stale_task_scores(db: Session) -> bool:
+    """Rebuild every stored score unless that was already done today, then commit.
+
+    Only one transaction rebuilds at a time: while another one holds the lock the current
+    scores are kept and False is returned, as when they are already fresh.
+    """
+    today = datetime.now().date()
+    locked = db.execute(select(func.pg_try_advisory_xact_lock(SCORE_REFRESH_LOCK_ID))).scalar()
+    if not locked:
+        return False
+    # Checked again under the lock, the holder before us may have just rebuilt them
+    refreshed_on = db.query(TaskScoreRefresh.refreshed_on).scalar()
+    if refreshed_on is not None and refreshed_on >= today:
+        db.commit()
+        return False
+    refresh_task_scores(db)
+    db.commit()
+    return True
+
+
+@recommendation_seconds.time("get_stored_task_recommendations")
+def get_stored_task_recommendations(
+    db: Session, limit: int = None, for_planning: bool = False
+) -> List[Dict[str, Any]]:
+    """Top-N recommendations read from `task_score`.
+
+    The scores are normally rebuilt by a scheduled job; when it has not run today the first
+    request rebuilds them, and concurrent requests keep reading yesterday's scores meanwhile.
+    """
+    today = datetime.now().date()
+
+    # Due-date, age and planning-window terms depend on the current date. The marker row
+    # is read instead of the scores, which may be empty without being stale
+    refreshed_on = db.query(TaskScoreRefresh.refreshed_on).scalar()
+    if refreshed_on is None or refreshed_on < today:
+        refresh_stale_task_scores(db)
+
+    score_column = TaskScore.planning_score if for_planning else TaskScore.score
+    query = (
+        db.query(Task, score_column)
+        .join(TaskScore, TaskScore.task_id == Task.id)
+        .filter(score_column.isnot(None))
+        .order_by(score_column.desc(), Task.id)
+    )
+    if limit:
+        query = query.limit(limit)
+    return [{"task": task, "score": score} for task, score in query.all()]
+
+
+if __name__ == "__main__":
+    from ..database import SessionLocal
+
+    with SessionLocal() as db:
+        refresh_task_scores(db)
+        db.commit()
+    print("Task scores rebuilt.")
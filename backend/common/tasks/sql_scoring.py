@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import Date, Float, and_, case, cast, func, or_, select
+from sqlalchemy.orm import Session
+
+from .enums import ProjectState, TaskState
+from .models import Project, Task, TaskPlanning
+from .recommendations import SCORE_WEIGHTS, TIME_CONSTANTS
+
+# Server-side twin of recommendations.score_task. Every term is evaluated as double precision
+# in the same order as the Python code, so scores match up to floating-point rounding.
+
+
+def _float(expression):
+    return cast(expression, Float)
+
+
+def task_score_expression(today, nearest_planning, for_planning: bool = False):
+    """SQL score of a Task row joined to its Project and nearest future planning date."""
+    due_in = _float(Task.due_date - today)
+    due_date_term = case(
+        (Task.due_date.is_(None), 0.0),
+        (due_in < 0, SCORE_WEIGHTS["overdue_base"] + func.abs(due_in)),
+        (
+            due_in <= TIME_CONSTANTS["upcoming_days"],
+            SCORE_WEIGHTS["upcoming_base"] - due_in * SCORE_WEIGHTS["upcoming_penalty"],
+        ),
+        else_=func.greatest(
+            0.0, SCORE_WEIGHTS["future_base"] - due_in / SCORE_WEIGHTS["future_decay"]
+        ),
+    )
+
+    if for_planning:
+        has_valid_plan = and_(
+            nearest_planning.isnot(None),
+            or_(Task.due_date.is_(None), nearest_planning <= Task.due_date),
+        )
+        planning_term = case(
+            (has_valid_plan, 0.0), else_=float(SCORE_WEIGHTS["no_future_plans_bonus"])
+        )
+        in_progress_weight = SCORE_WEIGHTS["in_progress_planning"]
+        pending_weight = SCORE_WEIGHTS["pending_planning"]
+    else:
+        planning_term = 0.0
+        in_progress_weight = SCORE_WEIGHTS["in_progress_basic"]
+        pending_weight = SCORE_WEIGHTS["pending_basic"]
+    state_term = case(
+        (Task.state == TaskState.IN_PROGRESS, float(in_progress_weight)),
+        (Task.state == TaskState.PENDING, float(pending_weight)),
+        else_=0.0,
+    )
+
+    age_days = _float(today - cast(Task.created_at, Date))
+    age_term = case(
+        (Task.created_at.is_(None), 0.0),
+        else_=func.least(
+            float(SCORE_WEIGHTS["age_limit"]), age_days * SCORE_WEIGHTS["age_multiplier"]
+        ),
+    )
+
+    priority_term = _float(func.coalesce(Task.priority, 0) * SCORE_WEIGHTS["priority_multiplier"])
+    project_multiplier = _float(func.coalesce(Project.priority, 1)) * 0.3
+    return (
+        priority_term + due_date_term + planning_term + state_term + age_term
+    ) * project_multiplier
+
+
+def get_task_recommendations_sql(
+    db: Session, limit: int = None, for_planning: bool = False
+) -> List[Dict[str, Any]]:
+    """Same output as get_task_recommendations, scored and ranked by PostgreSQL.
+
+    Only the top `limit` rows cross the wire; future plannings are reduced to their
+    earliest date per task inside the same statement.
+    """
+    today = datetime.now().date()
+
+    nearest_planning = (
+        select(
+            TaskPlanning.task_id,
+            func.min(TaskPlanning.planned_date).label("planned_date"),
+        )
+        .where(TaskPlanning.planned_date >= today)
+        .group_by(TaskPlanning.task_id)
+        .subquery()
+    )
+    score = task_score_expression(today, nearest_planning.c.planned_date, for_planning)
+
+    query = (
+        db.query(Task, score.label("score"))
+        .join(Project, Task.project_id == Project.id)
+        .outerjoin(nearest_planning, nearest_planning.c.task_id == Task.id)
+        .filter(
+            Project.state == ProjectState.IN_PROGRESS,
+            Task.state.in_([TaskState.PENDING, TaskState.IN_PROGRESS]),
+        )
+        .order_by(score.desc(), Task.id)
+    )
+    if for_planning:
+        # Skip tasks that are already planned inside the planning window
+        window_end = today + timedelta(days=TIME_CONSTANTS["planning_window_days"])
+        query = query.filter(
+            or_(
+                nearest_planning.c.planned_date.is_(None),
+                nearest_planning.c.planned_date >= window_end,
+            )
+        )
+    if limit:
+        query = query.limit(limit)
+    return [{"task": task, "score": score} for task, score in query.all()]
@@ -0,0 +1,90 @@
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+import common.tasks.models as models
+from common.database import AsyncSessionLocal
+from sqlalchemy import func, select
+from tasks import schemas
+from tasks.endpoints import GENERAL_INFO_STATEMENT
+
+# Latency of the single-statement general-info query against the previous four-query version.
+# Usage, from /backend/fastapi with the database env set: python -m benchmarks.general_info [N]
+
+
+async def four_queries(db, task_id, today):
+    task = await db.get(models.Task, task_id)
+    project = await db.get(models.Project, task.project_id) if task.project_id else None
+    last_notes = (
+        await db.scalars(
+            select(models.Note)
+            .where(models.Note.task_id == task_id)
+            .order_by(models.Note.updated_at.desc())
+            .limit(5)
+        )
+    ).all()
+    next_plannings = (
+        await db.scalars(
+            select(models.TaskPlanning).where(
+                models.TaskPlanning.task_id == task_id,
+                models.TaskPlanning.planned_date >= today,
+                models.TaskPlanning.planned_date <= today + timedelta(days=7),
+            )
+        )
+    ).all()
+    return schemas.TaskGeneralInfo(
+        **task.__dict__,
+        project=schemas.ProjectBase(**project.__dict__) if project else None,
+        last_notes=[schemas.NoteBase(**note.__dict__) for note in last_notes],
+        next_plannings=[
+            schemas.TaskPlanningBase(**planning.__dict__) for planning in next_plannings
+        ],
+    )
+
+
+async def single_query(db, task_id, today):
+    params = {"task_id": task_id, "date_from": today, "date_to": today + timedelta(days=7)}
+    task, project, last_notes, next_plannings = (
+        await db.execute(GENERAL_INFO_STATEMENT, params)
+    ).first()
+    return schemas.TaskGeneralInfo(
+        **task.__dict__, project=project, last_notes=last_notes, next_plannings=next_plannings
+    )
+
+
+async def measure(implementation, task_ids, today):
+    timings = []
+    for task_id in task_ids:
+        # A fresh session per call, as in a request: nothing is served from the identity map
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await implementation(db, task_id, today)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def main(samples):
+    today = datetime.utcnow().date()
+    async with AsyncSessionLocal() as db:
+        task_ids = (
+            await db.scalars(select(models.Task.id).order_by(func.random()).limit(samples))
+        ).all()
+
+    # Warm up the pool and the statement caches before timing
+    await measure(single_query, task_ids[:5], today)
+    await measure(four_queries, task_ids[:5], today)
+
+    for implementation in (four_queries, single_query):
+        timings = sorted(await measure(implementation, task_ids, today))
+        print(
+            f"{implementation.__name__:>13}: "
+            f"mean {statistics.mean(timings):.2f} ms, "
+            f"p50 {timings[len(timings) // 2]:.2f} ms, "
+            f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,134 @@
+import asyncio
+import gzip
+import json
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from typing import List
+
+import common.insights.models as insights_models
+import common.tasks.models as tasks_models
+from common.database import AsyncSessionLocal
+from fastapi.encoders import jsonable_encoder
+from insights import schemas as insights_schemas
+from pagination import MAX_PAGE_SIZE
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from tasks import schemas as tasks_schemas
+
+try:
+    import orjson
+except ImportError:  # Not an API dependency, only compared when installed
+    orjson = None
+
+# Serialization time and body size of a full page of list_tasks and list_metric_entries.
+# Rows are seeded in a transaction that is rolled back, so any database can be used.
+# Usage, from /backend/fastapi with the database env set: python -m benchmarks.responses [N]
+
+GZIP_LEVEL = 6
+
+
+def stdlib_json(adapter, rows):
+    # What JSONResponse did: encode to Python primitives, then json.dumps
+    content = jsonable_encoder(adapter.validate_python(rows, from_attributes=True))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def orjson_response(adapter, rows):
+    # ORJSONResponse: the same primitives, dumped by orjson
+    return orjson.dumps(jsonable_encoder(adapter.validate_python(rows, from_attributes=True)))
+
+
+def pydantic_dump_json(adapter, rows):
+    # FastAPI's default when a response model is set: straight to JSON bytes in pydantic-core
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+
+def measure(serializer, adapter, rows, samples):
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        body = serializer(adapter, rows)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), body
+
+
+async def seed(db, rows):
+    await db.execute(
+        insert(tasks_models.Task),
+        [
+            {
+                "title": f"Benchmark task {i}",
+                "description": "Seeded by benchmarks.responses " * 4,
+                "state": "pending",
+                "priority": i % 5 + 1,
+                "due_date": date.today() + timedelta(days=i % 90),
+            }
+            for i in range(rows)
+        ],
+    )
+    metric_id = (
+        await db.execute(
+            insert(insights_models.Metric)
+            .values(name="Benchmark metric", unit="kg")
+            .returning(insights_models.Metric.id)
+        )
+    ).scalar_one()
+    await db.execute(
+        insert(insights_models.MetricEntry),
+        [
+            {"metric_id": metric_id, "date": date.today() - timedelta(days=i), "value": 70 + i % 7}
+            for i in range(rows)
+        ],
+    )
+    return metric_id
+
+
+async def main(rows, samples=20):
+    serializers = [stdlib_json, pydantic_dump_json]
+    if orjson is not None:
+        serializers.insert(1, orjson_response)
+
+    async with AsyncSessionLocal() as db:
+        metric_id = await seed(db, rows)
+        pages = {
+            "list_tasks": (
+                TypeAdapter(List[tasks_schemas.Task]),
+                (
+                    await db.scalars(
+                        select(tasks_models.Task)
+                        .order_by(tasks_models.Task.id)
+                        .limit(MAX_PAGE_SIZE)
+                    )
+                ).all(),
+            ),
+            "list_metric_entries": (
+                TypeAdapter(List[insights_schemas.MetricEntry]),
+                (
+                    await db.scalars(
+                        select(insights_models.MetricEntry)
+                        .where(insights_models.MetricEntry.metric_id == metric_id)
+                        .order_by(insights_models.MetricEntry.date.desc())
+                        .limit(MAX_PAGE_SIZE)
+                    )
+                ).all(),
+            ),
+        }
+        for endpoint, (adapter, page) in pages.items():
+            print(f"{endpoint} ({len(page)} rows)")
+            for serializer in serializers:
+                milliseconds, body = measure(serializer, adapter, page, samples)
+                start = time.perf_counter()
+                compressed = gzip.compress(body, GZIP_LEVEL)
+                gzip_milliseconds = (time.perf_counter() - start) * 1000
+                print(
+                    f"  {serializer.__name__:>18}: {milliseconds:6.2f} ms, {len(body):>7} bytes, "
+                    f"gzip {len(compressed):>6} bytes in {gzip_milliseconds:.2f} ms"
+                )
+        # Rolling back expires the rows, so it comes after the measurements
+        await db.rollback()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,39 @@
+from typing import Iterable, List, Set
+
+from pydantic import BaseModel, Field
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+MAX_BULK_ITEMS = 1000
+
+
+class BulkItemError(BaseModel):
+    """A rejected item of a bulk request, by its position in the request body."""
+
+    index: int
+    detail: str
+
+
+class BulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class BulkDeleteResult(BaseModel):
+    deleted: List[int] = []
+    errors: List[BulkItemError] = []
+
+
+async def existing_ids(db: AsyncSession, column, ids: Iterable[int]) -> Set[int]:
+    """Subset of `ids` present in `column`, checked with a single IN query."""
+    ids = {id_ for id_ in ids if id_ is not None}
+    if not ids:
+        return set()
+    return set((await db.scalars(select(column).where(column.in_(ids)))).all())
+
+
+async def insert_returning(db: AsyncSession, model, rows: List[dict]) -> list:
+    """Insert `rows` as one multi-row INSERT ... RETURNING and return the new objects."""
+    if not rows:
+        return []
+    statement = insert(model).returning(model, sort_by_parameter_order=True)
+    return (await db.scalars(statement, rows)).all()
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import os
+from typing import List, Optional
+
+from common.database import DB_TRANSACTION_POOLER, get_async_engine
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+CHANNEL = "row_changes"
+# Tables whose triggers publish on CHANNEL, see supabase/migrations/*_change_feed.sql
+FEED_TABLES = ("task", "task_planning", "note", "daily_insights", "habit_entry", "metric_entry")
+KEEPALIVE_SECONDS = float(os.getenv("CHANGE_FEED_KEEPALIVE", "15"))
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "1000"))
+
+router = APIRouter()
+
+
+class ChangeFeed:
+    """Fans the notifications of one LISTEN connection out to every connected client.
+
+    A client that falls SUBSCRIBER_QUEUE_SIZE changes behind, or that is connected when the
+    LISTEN connection drops, gets a `reset` event and should reload its view.
+    LISTEN needs a session connection: it does not work through a transaction pooler.
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self._connection = None
+        self._invalidating = None
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self) -> asyncio.Queue:
+        async with self._lock:
+            if self._connection is None:
+                await self._listen()
+        queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+    async def _listen(self):
+        # Checked out of the pool for the life of the process
+        self._connection = await get_async_engine().connect()
+        raw_connection = await self._connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        driver_connection.add_termination_listener(self._on_terminated)
+        await driver_connection.add_listener(CHANNEL, self._on_notification)
+
+    def _on_notification(self, connection, pid, channel, payload):
+        change = json.loads(payload)
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(("change", change))
+            except asyncio.QueueFull:
+                self._reset(queue)
+
+    def _on_terminated(self, connection):
+        # Hand the pool slot back; the dead connection is discarded, not reused
+        lost, self._connection = self._connection, None
+        if lost is not None:
+            self._invalidating = asyncio.ensure_future(lost.invalidate())
+        for queue in list(self.subscribers):
+            self._reset(queue)
+
+    def _reset(self, queue: asyncio.Queue):
+        # Pending changes are useless to a client that has to reload anyway
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(("reset", None))
+        self.unsubscribe(queue)
+
+
+change_feed = ChangeFeed()
+
+
+def _event(name: str, data) -> str:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream(request: Request, queue: asyncio.Queue, tables: set):
+    try:
+        while not await request.is_disconnected():
+            try:
+                name, change = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # Comment line, keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+            if name == "reset":
+                yield _event("reset", {})
+                return
+            if change["table"] in tables:
+                yield _event("change", change)
+    finally:
+        change_feed.unsubscribe(queue)
+
+
+@router.get("/changes")
+async def stream_changes(
+    request: Request,
+    tables: Optional[List[str]] = Query(None, description=f"Any of {', '.join(FEED_TABLES)}"),
+):
+    """Server-sent events with the rows inserted, updated or deleted after connecting.
+
+    Each `change` event carries `table`, `op` (insert, update or delete), `id` and `row`,
+    the row as stored or `null` when it is too large for a notification.
+    """
+    if DB_TRANSACTION_POOLER:
+        raise HTTPException(
+            status_code=503,
+            detail="The change feed needs a session connection: LISTEN does not work "
+            "through the transaction pooler (DB_TRANSACTION_POOLER)",
+        )
+    unknown = set(tables or ()) - set(FEED_TABLES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown tables: {', '.join(sorted(unknown))}")
+    queue = await change_feed.subscribe()
+    return StreamingResponse(
+        _stream(request, queue, set(tables or FEED_TABLES)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
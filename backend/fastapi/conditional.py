@@ -0,0 +1,55 @@
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _etag(request: Request, count: int, last_updated) -> str:
+    # The query string is part of the tag: filters and cursors select different pages
+    key = f"{request.url.path}?{request.url.query}|{count}|{last_updated}"
+    # Weak: the same representation may be sent compressed or not
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    # Weak comparison, the W/ prefix is ignored
+    return "*" in tags or etag in tags or etag[2:] in tags
+
+
+async def not_modified(
+    request: Request, response: Response, db: AsyncSession, statement
+) -> Optional[Response]:
+    """Validators for the rows selected by `statement`, from their count and latest
+    `updated_at`.
+
+    Sets ETag and Last-Modified on `response` and returns a 304 response when the client's
+    If-None-Match already holds the tag, so the caller can skip loading and serializing the
+    rows. Returns None when the response has to be built, or when no row matches.
+    """
+    rows = statement.subquery()
+    count, last_updated = (
+        await db.execute(select(func.count(), func.max(rows.c.updated_at)))
+    ).one()
+    if not count:
+        return None
+
+    headers = {
+        "ETag": _etag(request, count, last_updated),
+        # Clients may keep the representation but have to revalidate it before each use
+        "Cache-Control": "private, no-cache",
+    }
+    if last_updated:
+        # Timestamps are stored without time zone, in the database's UTC
+        last_modified = last_updated.replace(microsecond=0, tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    if _matches(request.headers.get("If-None-Match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
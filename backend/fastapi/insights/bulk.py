@@ -0,0 +1,98 @@
+from typing import List
+
+import common.insights.models as models
+from bulk import MAX_BULK_ITEMS, BulkItemError, insert_returning
+from common.database import get_async_db
+from fastapi import APIRouter, Body, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from writes import row_values
+
+from . import schemas
+
+router = APIRouter()
+
+
+async def _taken_dates(db: AsyncSession, date_column, owner_column, owner_id, dates) -> set:
+    """Dates among `dates` that already have an entry, checked with a single IN query."""
+    statement = select(date_column).where(owner_column == owner_id, date_column.in_(set(dates)))
+    return set((await db.scalars(statement)).all())
+
+
+def _habit_entry_error(habit, entry) -> str:
+    if habit.type == "boolean":
+        if entry.completed is None:
+            return "completed is required for boolean habits"
+        if entry.score is not None:
+            return "score is not allowed for boolean habits"
+    elif habit.type == "score":
+        if entry.score is None:
+            return "score is required for score habits"
+        if entry.completed is not None:
+            return "completed is not allowed for score habits"
+    return None
+
+
+@router.post("/habits/{habit_id}/entries/bulk", response_model=schemas.HabitEntryBulkResult)
+async def create_habit_entries(
+    habit_id: int,
+    entries: List[schemas.HabitEntryCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    habit = await db.get(models.Habit, habit_id)
+    if not habit:
+        raise HTTPException(status_code=404, detail="Habit not found")
+
+    taken = await _taken_dates(
+        db,
+        models.HabitEntry.date,
+        models.HabitEntry.habit_id,
+        habit_id,
+        (entry.date for entry in entries),
+    )
+
+    rows, errors = [], []
+    for index, entry in enumerate(entries):
+        detail = _habit_entry_error(habit, entry)
+        if detail is None and entry.date in taken:
+            detail = "Entry for this date already exists"
+        if detail:
+            errors.append(BulkItemError(index=index, detail=detail))
+            continue
+        taken.add(entry.date)
+        rows.append(row_values(entry, habit_id=habit_id))
+
+    created = await insert_returning(db, models.HabitEntry, rows)
+    await db.commit()
+    return schemas.HabitEntryBulkResult(items=created, errors=errors)
+
+
+@router.post("/metrics/{metric_id}/entries/bulk", response_model=schemas.MetricEntryBulkResult)
+async def create_metric_entries(
+    metric_id: int,
+    entries: List[schemas.MetricEntryCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    metric = await db.get(models.Metric, metric_id)
+    if not metric:
+        raise HTTPException(status_code=404, detail="Metric not found")
+
+    taken = await _taken_dates(
+        db,
+        models.MetricEntry.date,
+        models.MetricEntry.metric_id,
+        metric_id,
+        (entry.date for entry in entries),
+    )
+
+    rows, errors = [], []
+    for index, entry in enumerate(entries):
+        if entry.date in taken:
+            errors.append(BulkItemError(index=index, detail="Entry for this date already exists"))
+            continue
+        taken.add(entry.date)
+        rows.append(row_values(entry, metric_id=metric_id))
+
+    created = await insert_returning(db, models.MetricEntry, rows)
+    await db.commit()
+    return schemas.MetricEntryBulkResult(items=created, errors=errors)
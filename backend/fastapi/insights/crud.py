@@ -1,9 +1,15 @@
-from typing import List
+from datetime import date
+from typing import List, Optional
 
 import common.insights.models as models
-from common.database import get_db
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from common.database import get_async_db
+from common.insights.enums import InsightType
+from conditional import not_modified
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pagination import PageParams, paginate
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from writes import insert_one, row_values, update_one
 
 from . import schemas
 
@@ -13,92 +19,79 @@ router = APIRouter()
 
 
 @router.get("/daily-insights/", response_model=List[schemas.DailyInsight])
-def list_daily_insights(db: Session = Depends(get_db)):
-    return db.query(models.DailyInsight).all()
+async def list_daily_insights(
+    request: Request,
+    response: Response,
+    type: Optional[InsightType] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    statement = select(models.DailyInsight)
+    if type:
+        statement = statement.where(models.DailyInsight.type == type.value)
+    if date_from:
+        statement = statement.where(models.DailyInsight.date >= date_from)
+    if date_to:
+        statement = statement.where(models.DailyInsight.date <= date_to)
+    keys = [(models.DailyInsight.date, True), (models.DailyInsight.id, True)]
+    cached = await not_modified(request, response, db, statement)
+    if cached:
+        return cached
+    return await paginate(db, statement, page, response, keys=keys)
 
 
 @router.get("/daily-insights/{insight_id}", response_model=schemas.DailyInsight)
-def get_daily_insight(insight_id: int, db: Session = Depends(get_db)):
-    insight = db.query(models.DailyInsight).filter(models.DailyInsight.id == insight_id).first()
+async def get_daily_insight(
+    insight_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    cached = await not_modified(
+        request,
+        response,
+        db,
+        select(models.DailyInsight).where(models.DailyInsight.id == insight_id),
+    )
+    if cached:
+        return cached
+    insight = await db.get(models.DailyInsight, insight_id)
     if not insight:
         raise HTTPException(status_code=404, detail="Daily insight not found")
     return insight
 
 
 @router.post("/daily-insights/", response_model=schemas.DailyInsight)
-def create_daily_insight(insight: schemas.DailyInsightCreate, db: Session = Depends(get_db)):
-    # Check if insight for date and type already exists
-    existing_insight = (
-        db.query(models.DailyInsight)
-        .filter(
-            models.DailyInsight.date == insight.date, models.DailyInsight.type == insight.type.value
-        )
-        .first()
-    )
-    if existing_insight:
-        raise HTTPException(status_code=400, detail="Insight for this date and type already exists")
-
-    # Create insight data, excluding None values to let model defaults apply
-    insight_data = insight.dict(exclude_unset=True)
-    insight_data["type"] = insight.type.value  # Convert enum to string
-
-    try:
-        db_insight = models.DailyInsight(**insight_data)
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
-    db.add(db_insight)
-    db.commit()
-    db.refresh(db_insight)
+async def create_daily_insight(
+    insight: schemas.DailyInsightCreate, db: AsyncSession = Depends(get_async_db)
+):
+    # A second insight for the same date and type is rejected by the unique constraint
+    db_insight = await insert_one(db, models.DailyInsight, row_values(insight))
+    await db.commit()
     return db_insight
 
 
 @router.put("/daily-insights/{insight_id}", response_model=schemas.DailyInsight)
-def update_daily_insight(
-    insight_id: int, insight_data: schemas.DailyInsightUpdate, db: Session = Depends(get_db)
+async def update_daily_insight(
+    insight_id: int,
+    insight_data: schemas.DailyInsightUpdate,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    db_insight = db.query(models.DailyInsight).filter(models.DailyInsight.id == insight_id).first()
+    db_insight = await update_one(
+        db, models.DailyInsight, row_values(insight_data), models.DailyInsight.id == insight_id
+    )
     if not db_insight:
         raise HTTPException(status_code=404, detail="Daily insight not found")
-
-    # Check if updated date and type would conflict with another insight
-    if insight_data.date and insight_data.type:
-        existing_insight = (
-            db.query(models.DailyInsight)
-            .filter(
-                models.DailyInsight.date == insight_data.date,
-                models.DailyInsight.type == insight_data.type.value,
-                models.DailyInsight.id != insight_id,
-            )
-            .first()
-        )
-        if existing_insight:
-            raise HTTPException(
-                status_code=400, detail="Insight for this date and type already exists"
-            )
-
-    update_data = insight_data.dict(exclude_unset=True)
-    if "type" in update_data:
-        update_data["type"] = update_data["type"].value  # Convert enum to string
-
-    for key, value in update_data.items():
-        setattr(db_insight, key, value)
-
-    try:
-        db.commit()
-        db.refresh(db_insight)
-    except ValueError as ve:
-        db.rollback()
-        raise HTTPException(status_code=400, detail=str(ve))
+    await db.commit()
     return db_insight
 
 
 @router.delete("/daily-insights/{insight_id}")
-def delete_daily_insight(insight_id: int, db: Session = Depends(get_db)):
-    insight = db.query(models.DailyInsight).filter(models.DailyInsight.id == insight_id).first()
+async def delete_daily_insight(insight_id: int, db: AsyncSession = Depends(get_async_db)):
+    insight = await db.get(models.DailyInsight, insight_id)
     if not insight:
         raise HTTPException(status_code=404, detail="Daily insight not found")
-    db.delete(insight)
-    db.commit()
+    await db.delete(insight)
+    await db.commit()
     return {"message": "Daily insight deleted successfully"}
 
 
@@ -108,84 +101,91 @@ def delete_daily_insight(insight_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/habits/", response_model=List[schemas.Habit])
-def list_habits(db: Session = Depends(get_db)):
-    return db.query(models.Habit).all()
+async def list_habits(
+    request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    statement = select(models.Habit)
+    cached = await not_modified(request, response, db, statement)
+    if cached:
+        return cached
+    return (await db.scalars(statement)).all()
 
 
 @router.get("/habits/{habit_id}", response_model=schemas.Habit)
-def get_habit(habit_id: int, db: Session = Depends(get_db)):
-    habit = db.query(models.Habit).filter(models.Habit.id == habit_id).first()
+async def get_habit(
+    habit_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    cached = await not_modified(
+        request, response, db, select(models.Habit).where(models.Habit.id == habit_id)
+    )
+    if cached:
+        return cached
+    habit = await db.get(models.Habit, habit_id)
     if not habit:
         raise HTTPException(status_code=404, detail="Habit not found")
     return habit
 
 
 @router.post("/habits/", response_model=schemas.Habit)
-def create_habit(habit: schemas.HabitCreate, db: Session = Depends(get_db)):
-    try:
-        db_habit = models.Habit(
-            name=habit.name,
-            description=habit.description,
-            type=habit.type.value,  # Convert enum to string
-        )
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
-    db.add(db_habit)
-    db.commit()
-    db.refresh(db_habit)
+async def create_habit(habit: schemas.HabitCreate, db: AsyncSession = Depends(get_async_db)):
+    db_habit = await insert_one(db, models.Habit, row_values(habit))
+    await db.commit()
     return db_habit
 
 
 @router.put("/habits/{habit_id}", response_model=schemas.Habit)
-def update_habit(habit_id: int, habit_data: schemas.HabitUpdate, db: Session = Depends(get_db)):
-    db_habit = db.query(models.Habit).filter(models.Habit.id == habit_id).first()
+async def update_habit(
+    habit_id: int, habit_data: schemas.HabitUpdate, db: AsyncSession = Depends(get_async_db)
+):
+    db_habit = await update_one(
+        db, models.Habit, row_values(habit_data), models.Habit.id == habit_id
+    )
     if not db_habit:
         raise HTTPException(status_code=404, detail="Habit not found")
-
-    update_data = habit_data.dict(exclude_unset=True)
-    if "type" in update_data and update_data["type"] is not None:
-        update_data["type"] = update_data["type"].value
-
-    for key, value in update_data.items():
-        setattr(db_habit, key, value)
-
-    try:
-        db.commit()
-        db.refresh(db_habit)
-    except ValueError as ve:
-        db.rollback()
-        raise HTTPException(status_code=400, detail=str(ve))
+    await db.commit()
     return db_habit
 
 
 @router.delete("/habits/{habit_id}")
-def delete_habit(habit_id: int, db: Session = Depends(get_db)):
-    habit = db.query(models.Habit).filter(models.Habit.id == habit_id).first()
+async def delete_habit(habit_id: int, db: AsyncSession = Depends(get_async_db)):
+    habit = await db.get(models.Habit, habit_id)
     if not habit:
         raise HTTPException(status_code=404, detail="Habit not found")
-    db.delete(habit)
-    db.commit()
+    await db.delete(habit)
+    await db.commit()
     return {"message": "Habit deleted successfully"}
 
 
 @router.get("/habits/{habit_id}/entries", response_model=List[schemas.HabitEntry])
-def list_habit_entries(habit_id: int, db: Session = Depends(get_db)):
-    habit = db.query(models.Habit).filter(models.Habit.id == habit_id).first()
+async def list_habit_entries(
+    habit_id: int,
+    request: Request,
+    response: Response,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    habit = await db.get(models.Habit, habit_id)
     if not habit:
         raise HTTPException(status_code=404, detail="Habit not found")
-    return (
-        db.query(models.HabitEntry)
-        .filter(models.HabitEntry.habit_id == habit_id)
-        .order_by(models.HabitEntry.date.desc())
-        .all()
-    )
+    statement = select(models.HabitEntry).where(models.HabitEntry.habit_id == habit_id)
+    if date_from:
+        statement = statement.where(models.HabitEntry.date >= date_from)
+    if date_to:
+        statement = statement.where(models.HabitEntry.date <= date_to)
+    keys = [(models.HabitEntry.date, True), (models.HabitEntry.id, True)]
+    cached = await not_modified(request, response, db, statement)
+    if cached:
+        return cached
+    return await paginate(db, statement, page, response, keys=keys)
 
 
 @router.post("/habits/{habit_id}/entries", response_model=schemas.HabitEntry)
-def create_habit_entry(
-    habit_id: int, entry: schemas.HabitEntryCreate, db: Session = Depends(get_db)
+async def create_habit_entry(
+    habit_id: int, entry: schemas.HabitEntryCreate, db: AsyncSession = Depends(get_async_db)
 ):
-    habit = db.query(models.Habit).filter(models.Habit.id == habit_id).first()
+    habit = await db.get(models.Habit, habit_id)
     if not habit:
         raise HTTPException(status_code=404, detail="Habit not found")
 
@@ -201,46 +201,44 @@ def create_habit_entry(
         if entry.completed is not None:
             raise HTTPException(status_code=400, detail="completed is not allowed for score habits")
 
-    existing = (
-        db.query(models.HabitEntry)
-        .filter(models.HabitEntry.habit_id == habit_id, models.HabitEntry.date == entry.date)
-        .first()
-    )
-    if existing:
-        raise HTTPException(status_code=400, detail="Entry for this date already exists")
-
-    db_entry = models.HabitEntry(
-        habit_id=habit_id,
-        date=entry.date,
-        score=entry.score,
-        completed=entry.completed,
-    )
-    db.add(db_entry)
-    db.commit()
-    db.refresh(db_entry)
+    # A second entry for the same date is rejected by the unique constraint
+    db_entry = await insert_one(db, models.HabitEntry, row_values(entry, habit_id=habit_id))
+    await db.commit()
     return db_entry
 
 
+@router.get("/habits/{habit_id}/entries/{entry_id}", response_model=schemas.HabitEntry)
+async def get_habit_entry(
+    habit_id: int,
+    entry_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    statement = select(models.HabitEntry).where(
+        models.HabitEntry.id == entry_id, models.HabitEntry.habit_id == habit_id
+    )
+    cached = await not_modified(request, response, db, statement)
+    if cached:
+        return cached
+    entry = (await db.scalars(statement)).first()
+    if not entry:
+        raise HTTPException(status_code=404, detail="Habit entry not found")
+    return entry
+
+
 @router.put("/habits/{habit_id}/entries/{entry_id}", response_model=schemas.HabitEntry)
-def update_habit_entry(
+async def update_habit_entry(
     habit_id: int,
     entry_id: int,
     entry_data: schemas.HabitEntryUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    habit = db.query(models.Habit).filter(models.Habit.id == habit_id).first()
+    habit = await db.get(models.Habit, habit_id)
     if not habit:
         raise HTTPException(status_code=404, detail="Habit not found")
 
-    db_entry = (
-        db.query(models.HabitEntry)
-        .filter(models.HabitEntry.id == entry_id, models.HabitEntry.habit_id == habit_id)
-        .first()
-    )
-    if not db_entry:
-        raise HTTPException(status_code=404, detail="Habit entry not found")
-
-    update_data = entry_data.dict(exclude_unset=True)
+    update_data = row_values(entry_data)
 
     # Validate based on habit type
     if habit.type == "boolean":
@@ -250,39 +248,35 @@ def update_habit_entry(
         if "completed" in update_data and update_data["completed"] is not None:
             raise HTTPException(status_code=400, detail="completed is not allowed for score habits")
 
-    # Ensure date uniqueness if date is updated
-    if "date" in update_data:
-        exists = (
-            db.query(models.HabitEntry)
-            .filter(
-                models.HabitEntry.habit_id == habit_id,
-                models.HabitEntry.date == update_data["date"],
-                models.HabitEntry.id != entry_id,
-            )
-            .first()
-        )
-        if exists:
-            raise HTTPException(status_code=400, detail="Entry for this date already exists")
-
-    for key, value in update_data.items():
-        setattr(db_entry, key, value)
-
-    db.commit()
-    db.refresh(db_entry)
+    # Date uniqueness is checked by the unique constraint
+    db_entry = await update_one(
+        db,
+        models.HabitEntry,
+        update_data,
+        models.HabitEntry.id == entry_id,
+        models.HabitEntry.habit_id == habit_id,
+    )
+    if not db_entry:
+        raise HTTPException(status_code=404, detail="Habit entry not found")
+    await db.commit()
     return db_entry
 
 
 @router.delete("/habits/{habit_id}/entries/{entry_id}")
-def delete_habit_entry(habit_id: int, entry_id: int, db: Session = Depends(get_db)):
+async def delete_habit_entry(
+    habit_id: int, entry_id: int, db: AsyncSession = Depends(get_async_db)
+):
     entry = (
-        db.query(models.HabitEntry)
-        .filter(models.HabitEntry.id == entry_id, models.HabitEntry.habit_id == habit_id)
-        .first()
-    )
+        await db.scalars(
+            select(models.HabitEntry).where(
+                models.HabitEntry.id == entry_id, models.HabitEntry.habit_id == habit_id
+            )
+        )
+    ).first()
     if not entry:
         raise HTTPException(status_code=404, detail="Habit entry not found")
-    db.delete(entry)
-    db.commit()
+    await db.delete(entry)
+    await db.commit()
     return {"message": "Habit entry deleted successfully"}
 
 
@@ -292,139 +286,154 @@ def delete_habit_entry(habit_id: int, entry_id: int, db: Session = Depends(get_d
 
 
 @router.get("/metrics/", response_model=List[schemas.Metric])
-def list_metrics(db: Session = Depends(get_db)):
-    return db.query(models.Metric).all()
+async def list_metrics(
+    request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    statement = select(models.Metric)
+    cached = await not_modified(request, response, db, statement)
+    if cached:
+        return cached
+    return (await db.scalars(statement)).all()
 
 
 @router.get("/metrics/{metric_id}", response_model=schemas.Metric)
-def get_metric(metric_id: int, db: Session = Depends(get_db)):
-    metric = db.query(models.Metric).filter(models.Metric.id == metric_id).first()
+async def get_metric(
+    metric_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    cached = await not_modified(
+        request, response, db, select(models.Metric).where(models.Metric.id == metric_id)
+    )
+    if cached:
+        return cached
+    metric = await db.get(models.Metric, metric_id)
     if not metric:
         raise HTTPException(status_code=404, detail="Metric not found")
     return metric
 
 
 @router.post("/metrics/", response_model=schemas.Metric)
-def create_metric(metric: schemas.MetricCreate, db: Session = Depends(get_db)):
-    db_metric = models.Metric(name=metric.name, description=metric.description, unit=metric.unit)
-    db.add(db_metric)
-    db.commit()
-    db.refresh(db_metric)
+async def create_metric(metric: schemas.MetricCreate, db: AsyncSession = Depends(get_async_db)):
+    db_metric = await insert_one(db, models.Metric, row_values(metric))
+    await db.commit()
     return db_metric
 
 
 @router.put("/metrics/{metric_id}", response_model=schemas.Metric)
-def update_metric(metric_id: int, metric_data: schemas.MetricUpdate, db: Session = Depends(get_db)):
-    db_metric = db.query(models.Metric).filter(models.Metric.id == metric_id).first()
+async def update_metric(
+    metric_id: int, metric_data: schemas.MetricUpdate, db: AsyncSession = Depends(get_async_db)
+):
+    db_metric = await update_one(
+        db, models.Metric, row_values(metric_data), models.Metric.id == metric_id
+    )
     if not db_metric:
         raise HTTPException(status_code=404, detail="Metric not found")
-
-    for key, value in metric_data.dict(exclude_unset=True).items():
-        setattr(db_metric, key, value)
-    db.commit()
-    db.refresh(db_metric)
+    await db.commit()
     return db_metric
 
 
 @router.delete("/metrics/{metric_id}")
-def delete_metric(metric_id: int, db: Session = Depends(get_db)):
-    metric = db.query(models.Metric).filter(models.Metric.id == metric_id).first()
+async def delete_metric(metric_id: int, db: AsyncSession = Depends(get_async_db)):
+    metric = await db.get(models.Metric, metric_id)
     if not metric:
         raise HTTPException(status_code=404, detail="Metric not found")
-    db.delete(metric)
-    db.commit()
+    await db.delete(metric)
+    await db.commit()
     return {"message": "Metric deleted successfully"}
 
 
 @router.get("/metrics/{metric_id}/entries", response_model=List[schemas.MetricEntry])
-def list_metric_entries(metric_id: int, db: Session = Depends(get_db)):
-    metric = db.query(models.Metric).filter(models.Metric.id == metric_id).first()
+async def list_metric_entries(
+    metric_id: int,
+    request: Request,
+    response: Response,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    metric = await db.get(models.Metric, metric_id)
     if not metric:
         raise HTTPException(status_code=404, detail="Metric not found")
-    return (
-        db.query(models.MetricEntry)
-        .filter(models.MetricEntry.metric_id == metric_id)
-        .order_by(models.MetricEntry.date.desc())
-        .all()
-    )
+    statement = select(models.MetricEntry).where(models.MetricEntry.metric_id == metric_id)
+    if date_from:
+        statement = statement.where(models.MetricEntry.date >= date_from)
+    if date_to:
+        statement = statement.where(models.MetricEntry.date <= date_to)
+    keys = [(models.MetricEntry.date, True), (models.MetricEntry.id, True)]
+    cached = await not_modified(request, response, db, statement)
+    if cached:
+        return cached
+    return await paginate(db, statement, page, response, keys=keys)
 
 
 @router.post("/metrics/{metric_id}/entries", response_model=schemas.MetricEntry)
-def create_metric_entry(
-    metric_id: int, entry: schemas.MetricEntryCreate, db: Session = Depends(get_db)
+async def create_metric_entry(
+    metric_id: int, entry: schemas.MetricEntryCreate, db: AsyncSession = Depends(get_async_db)
 ):
-    metric = db.query(models.Metric).filter(models.Metric.id == metric_id).first()
-    if not metric:
-        raise HTTPException(status_code=404, detail="Metric not found")
+    # The metric and the date uniqueness are checked by the table constraints
+    db_entry = await insert_one(db, models.MetricEntry, row_values(entry, metric_id=metric_id))
+    await db.commit()
+    return db_entry
 
-    existing = (
-        db.query(models.MetricEntry)
-        .filter(models.MetricEntry.metric_id == metric_id, models.MetricEntry.date == entry.date)
-        .first()
-    )
-    if existing:
-        raise HTTPException(status_code=400, detail="Entry for this date already exists")
 
-    db_entry = models.MetricEntry(metric_id=metric_id, date=entry.date, value=entry.value)
-    db.add(db_entry)
-    db.commit()
-    db.refresh(db_entry)
-    return db_entry
+@router.get("/metrics/{metric_id}/entries/{entry_id}", response_model=schemas.MetricEntry)
+async def get_metric_entry(
+    metric_id: int,
+    entry_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    statement = select(models.MetricEntry).where(
+        models.MetricEntry.id == entry_id, models.MetricEntry.metric_id == metric_id
+    )
+    cached = await not_modified(request, response, db, statement)
+    if cached:
+        return cached
+    entry = (await db.scalars(statement)).first()
+    if not entry:
+        raise HTTPException(status_code=404, detail="Metric entry not found")
+    return entry
 
 
 @router.put("/metrics/{metric_id}/entries/{entry_id}", response_model=schemas.MetricEntry)
-def update_metric_entry(
+async def update_metric_entry(
     metric_id: int,
     entry_id: int,
     entry_data: schemas.MetricEntryUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    metric = db.query(models.Metric).filter(models.Metric.id == metric_id).first()
-    if not metric:
-        raise HTTPException(status_code=404, detail="Metric not found")
-
-    db_entry = (
-        db.query(models.MetricEntry)
-        .filter(models.MetricEntry.id == entry_id, models.MetricEntry.metric_id == metric_id)
-        .first()
+    # Date uniqueness is checked by the unique constraint
+    db_entry = await update_one(
+        db,
+        models.MetricEntry,
+        row_values(entry_data),
+        models.MetricEntry.id == entry_id,
+        models.MetricEntry.metric_id == metric_id,
     )
     if not db_entry:
+        if not await db.get(models.Metric, metric_id):
+            raise HTTPException(status_code=404, detail="Metric not found")
         raise HTTPException(status_code=404, detail="Metric entry not found")
-
-    update_data = entry_data.dict(exclude_unset=True)
-
-    if "date" in update_data:
-        exists = (
-            db.query(models.MetricEntry)
-            .filter(
-                models.MetricEntry.metric_id == metric_id,
-                models.MetricEntry.date == update_data["date"],
-                models.MetricEntry.id != entry_id,
-            )
-            .first()
-        )
-        if exists:
-            raise HTTPException(status_code=400, detail="Entry for this date already exists")
-
-    for key, value in update_data.items():
-        setattr(db_entry, key, value)
-
-    db.commit()
-    db.refresh(db_entry)
+    await db.commit()
     return db_entry
 
 
 @router.delete("/metrics/{metric_id}/entries/{entry_id}")
-def delete_metric_entry(metric_id: int, entry_id: int, db: Session = Depends(get_db)):
+async def delete_metric_entry(
+    metric_id: int, entry_id: int, db: AsyncSession = Depends(get_async_db)
+):
     entry = (
-        db.query(models.MetricEntry)
-        .filter(models.MetricEntry.id == entry_id, models.MetricEntry.metric_id == metric_id)
-        .first()
-    )
+        await db.scalars(
+            select(models.MetricEntry).where(
+                models.MetricEntry.id == entry_id, models.MetricEntry.metric_id == metric_id
+            )
+        )
+    ).first()
     if not entry:
         raise HTTPException(status_code=404, detail="Metric entry not found")
-    db.delete(entry)
-    db.commit()
+    await db.delete(entry)
+    await db.commit()
     return {"message": "Metric entry deleted successfully"}
 
 
@@ -434,40 +443,46 @@ def delete_metric_entry(metric_id: int, entry_id: int, db: Session = Depends(get
 
 
 @router.patch("/daily-insights/{insight_id}", response_model=schemas.DailyInsight)
-def patch_daily_insight(
-    insight_id: int, insight_data: schemas.DailyInsightUpdate, db: Session = Depends(get_db)
+async def patch_daily_insight(
+    insight_id: int,
+    insight_data: schemas.DailyInsightUpdate,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return update_daily_insight(insight_id, insight_data, db)
+    return await update_daily_insight(insight_id, insight_data, db)
 
 
 @router.patch("/habits/{habit_id}", response_model=schemas.Habit)
-def patch_habit(habit_id: int, habit_data: schemas.HabitUpdate, db: Session = Depends(get_db)):
-    return update_habit(habit_id, habit_data, db)
+async def patch_habit(
+    habit_id: int, habit_data: schemas.HabitUpdate, db: AsyncSession = Depends(get_async_db)
+):
+    return await update_habit(habit_id, habit_data, db)
 
 
 @router.patch("/habits/{habit_id}/entries/{entry_id}", response_model=schemas.HabitEntry)
-def patch_habit_entry(
+async def patch_habit_entry(
     habit_id: int,
     entry_id: int,
     entry_data: schemas.HabitEntryUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return update_habit_entry(habit_id, entry_id, entry_data, db)
+    return await update_habit_entry(habit_id, entry_id, entry_data, db)
 
 
 @router.patch("/metrics/{metric_id}", response_model=schemas.Metric)
-def patch_metric(metric_id: int, metric_data: schemas.MetricUpdate, db: Session = Depends(get_db)):
-    return update_metric(metric_id, metric_data, db)
+async def patch_metric(
+    metric_id: int, metric_data: schemas.MetricUpdate, db: AsyncSession = Depends(get_async_db)
+):
+    return await update_metric(metric_id, metric_data, db)
 
 
 @router.patch("/metrics/{metric_id}/entries/{entry_id}", response_model=schemas.MetricEntry)
-def patch_metric_entry(
+async def patch_metric_entry(
     metric_id: int,
     entry_id: int,
     entry_data: schemas.MetricEntryUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return update_metric_entry(metric_id, entry_id, entry_data, db)
+    return await update_metric_entry(metric_id, entry_id, entry_data, db)
 
 
 # endregion
@@ -0,0 +1,190 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+import common.insights.models as models
+from common.database import get_async_db
+from common.insights.enums import InsightType, SeriesBucket
+from conditional import not_modified
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import Date, Integer, cast, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import schemas
+
+router = APIRouter()
+
+
+def _metric_series_statement(entries, bucket: SeriesBucket, window: Optional[int]):
+    """One row per bucket of the entries subquery, aggregated by PostgreSQL."""
+    bucket_start = cast(func.date_trunc(bucket.value, entries.c.date), Date).label("bucket")
+    buckets = (
+        select(
+            bucket_start,
+            func.count().label("count"),
+            func.min(entries.c.value).label("min"),
+            func.max(entries.c.value).label("max"),
+            func.avg(entries.c.value).label("avg"),
+            array_agg(aggregate_order_by(entries.c.value, entries.c.date.desc()))[1].label("last"),
+        )
+        .group_by(bucket_start)
+        .subquery()
+    )
+    columns = list(buckets.c)
+    if window:
+        # Over the previous buckets that have entries, empty buckets are not filled in
+        moving_avg = func.avg(buckets.c.avg).over(order_by=buckets.c.bucket, rows=(1 - window, 0))
+        columns.append(moving_avg.label("moving_avg"))
+    return select(*columns).order_by(buckets.c.bucket)
+
+
+@router.get("/metrics/{metric_id}/series", response_model=List[schemas.MetricSeriesPoint])
+async def get_metric_series(
+    metric_id: int,
+    request: Request,
+    response: Response,
+    bucket: SeriesBucket = SeriesBucket.DAY,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    window: Optional[int] = Query(
+        None, ge=2, le=365, description="Buckets averaged into moving_avg"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Entries of a metric downsampled to day, week or month buckets."""
+    metric = await db.get(models.Metric, metric_id)
+    if not metric:
+        raise HTTPException(status_code=404, detail="Metric not found")
+    entries = select(models.MetricEntry).where(models.MetricEntry.metric_id == metric_id)
+    if date_from:
+        entries = entries.where(models.MetricEntry.date >= date_from)
+    if date_to:
+        entries = entries.where(models.MetricEntry.date <= date_to)
+
+    cached = await not_modified(request, response, db, entries)
+    if cached:
+        return cached
+    statement = _metric_series_statement(entries.subquery(), bucket, window)
+    return (await db.execute(statement)).mappings().all()
+
+
+def _habit_statistics_statement(today: date, days: int):
+    """Streaks and recent completions of every habit, with gaps-and-islands over its entries."""
+    entry = models.HabitEntry
+    completed = (
+        select(
+            entry.habit_id,
+            entry.date,
+            # Consecutive dates share this value: each run of days is one island
+            (
+                entry.date
+                - cast(
+                    func.row_number().over(partition_by=entry.habit_id, order_by=entry.date),
+                    Integer,
+                )
+            ).label("island"),
+        )
+        .where(or_(entry.completed.is_(True), entry.score.isnot(None)), entry.date <= today)
+        .subquery()
+    )
+    islands = (
+        select(
+            completed.c.habit_id,
+            func.max(completed.c.date).label("last_day"),
+            func.count().label("length"),
+            func.count().filter(completed.c.date > today - timedelta(days=days)).label("recent"),
+        )
+        .group_by(completed.c.habit_id, completed.c.island)
+        .subquery()
+    )
+    streaks = (
+        select(
+            islands.c.habit_id,
+            func.max(islands.c.length).label("longest_streak"),
+            # A streak is still current until a whole day is missed
+            func.max(islands.c.length)
+            .filter(islands.c.last_day >= today - timedelta(days=1))
+            .label("current_streak"),
+            func.max(islands.c.last_day).label("last_completed"),
+            func.sum(islands.c.recent).label("completed_days"),
+        )
+        .group_by(islands.c.habit_id)
+        .subquery()
+    )
+    completed_days = func.coalesce(streaks.c.completed_days, 0)
+    return (
+        select(
+            models.Habit.id.label("habit_id"),
+            models.Habit.name,
+            models.Habit.type,
+            func.coalesce(streaks.c.current_streak, 0).label("current_streak"),
+            func.coalesce(streaks.c.longest_streak, 0).label("longest_streak"),
+            streaks.c.last_completed,
+            completed_days.label("completed_days"),
+            (completed_days / float(days)).label("completion_rate"),
+        )
+        .outerjoin(streaks, streaks.c.habit_id == models.Habit.id)
+        .order_by(models.Habit.id)
+    )
+
+
+@router.get("/habits/statistics", response_model=List[schemas.HabitStatistics])
+async def get_habit_statistics(
+    days: int = Query(30, ge=1, le=366, description="Days covered by completion_rate"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Current and longest streak plus completion rate of every habit, in one query.
+
+    A day counts as completed when its entry is marked completed or has a score.
+    """
+    today = datetime.utcnow().date()
+    return (await db.execute(_habit_statistics_statement(today, days))).mappings().all()
+
+
+@router.get("/daily-insights/trends", response_model=List[schemas.DailyInsightTrend])
+async def get_daily_insight_trends(
+    request: Request,
+    response: Response,
+    period: SeriesBucket = SeriesBucket.WEEK,
+    type: Optional[InsightType] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Average insight scores per day, week or month, without the insight texts.
+
+    Weeks and months are read from the daily_insights_rollup table.
+    """
+    if period == SeriesBucket.DAY:
+        table = models.DailyInsight
+        period_start, insights = table.date, literal(1)
+    else:
+        table = models.DailyInsightRollup
+        period_start, insights = table.period_start, table.insights
+        # The period that contains date_from is included
+        if date_from:
+            date_from = cast(func.date_trunc(period.value, date_from), Date)
+    statement = select(
+        period_start.label("period_start"),
+        table.type,
+        insights.label("insights"),
+        table.focus_score,
+        table.productivity_score,
+        table.sentiment_score,
+        table.general_score,
+        table.updated_at,
+    )
+    if period != SeriesBucket.DAY:
+        statement = statement.where(table.period == period.value)
+    if type:
+        statement = statement.where(table.type == type.value)
+    if date_from is not None:
+        statement = statement.where(period_start >= date_from)
+    if date_to:
+        statement = statement.where(period_start <= date_to)
+
+    cached = await not_modified(request, response, db, statement)
+    if cached:
+        return cached
+    statement = statement.order_by(period_start, table.type)
+    return (await db.execute(statement)).mappings().all()
@@ -1,8 +1,13 @@
 from fastapi import APIRouter
 
+from .bulk import router as bulk_router
 from .crud import router as crud_router
+from .endpoints import router as endpoints_router
 
 router = APIRouter()
 
+# Before the CRUD routes, so "/habits/statistics" is not matched as "/habits/{habit_id}"
+router.include_router(endpoints_router)
 # Include all CRUD operations
+router.include_router(bulk_router)
 router.include_router(crud_router)
@@ -1,6 +1,7 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 
+from bulk import BulkItemError
 from common.insights.enums import HabitType, InsightType
 from pydantic import BaseModel, validator
 
@@ -41,6 +42,16 @@ class DailyInsight(DailyInsightBase):
         from_attributes = True
 
 
+class DailyInsightTrend(BaseModel):
+    period_start: date
+    type: InsightType
+    insights: int
+    focus_score: Optional[float] = None
+    productivity_score: Optional[float] = None
+    sentiment_score: Optional[float] = None
+    general_score: Optional[float] = None
+
+
 # region Habits
 
 
@@ -106,6 +117,17 @@ class HabitEntry(HabitEntryBase):
         from_attributes = True
 
 
+class HabitStatistics(BaseModel):
+    habit_id: int
+    name: str
+    type: HabitType
+    current_streak: int
+    longest_streak: int
+    last_completed: Optional[date] = None
+    completed_days: int
+    completion_rate: float
+
+
 # endregion
 
 
@@ -160,4 +182,30 @@ class MetricEntry(MetricEntryBase):
         from_attributes = True
 
 
+class MetricSeriesPoint(BaseModel):
+    bucket: date
+    count: int
+    min: float
+    max: float
+    avg: float
+    last: float
+    moving_avg: Optional[float] = None
+
+
+# endregion
+
+
+# region Bulk
+
+
+class HabitEntryBulkResult(BaseModel):
+    items: List[HabitEntry] = []
+    errors: List[BulkItemError] = []
+
+
+class MetricEntryBulkResult(BaseModel):
+    items: List[MetricEntry] = []
+    errors: List[BulkItemError] = []
+
+
 # endregion
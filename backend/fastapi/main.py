@@ -1,14 +1,34 @@
+import logging
 import os
+import time
 
+from changes import router as changes_router
+from common.database import AsyncBackedSession, SessionLocal, get_pool_status
+from common.metrics import (
+    CONTENT_TYPE,
+    http_request_seconds,
+    http_requests,
+    render_metrics,
+)
+from common.query_stats import start_query_stats
+from common.tasks.score_store import track_task_score_changes
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.routing import iter_route_contexts
 from insights.router import router as insights_router
 from tasks.router import router as tasks_router
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Keep the materialized recommendation scores in sync with API writes
+track_task_score_changes(SessionLocal)
+track_task_score_changes(AsyncBackedSession)
+
 
 async def get_api_key(x_api_key: str = Header(None)):
     if not x_api_key or x_api_key != os.getenv("FASTAPI_API_KEY"):
@@ -29,10 +49,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression: bodies under the threshold are not worth the CPU, event streams are never
+# compressed. Responses keep the default serializer, Pydantic dumps them straight to JSON bytes
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv("API_GZIP_MIN_SIZE", "1000")),
+    compresslevel=int(os.getenv("API_GZIP_LEVEL", "6")),
+)
+
+
+@app.middleware("http")
+async def instrument_request(request: Request, call_next):
+    # Statements and database time of each request, to spot N+1 query patterns
+    stats = start_query_stats(f"{request.method} {request.url.path}")
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Route templates, not paths, keep the number of label values bounded
+    route = ROUTE_PATHS.get(id(request.scope.get("route")), "unmatched")
+    http_request_seconds.observe(time.perf_counter() - start, "fastapi", request.method, route)
+    http_requests.inc("fastapi", request.method, route, str(response.status_code))
+    response.headers.update(stats.headers())
+    logger.debug(
+        "%s %s: %d queries in %.2f ms",
+        request.method,
+        request.url.path,
+        stats.count,
+        stats.milliseconds,
+        extra=stats.log_fields(),
+    )
+    return response
+
+
 app.include_router(tasks_router, prefix="/tasks", dependencies=[Depends(get_api_key)])
 app.include_router(insights_router, prefix="/insights", dependencies=[Depends(get_api_key)])
+app.include_router(changes_router, tags=["changes"], dependencies=[Depends(get_api_key)])
 
 
 @app.get("/healthcheck")
 def healthcheck():
     return JSONResponse(content={"status": "ok"})
+
+
+@app.get("/healthcheck/db", dependencies=[Depends(get_api_key)])
+def database_healthcheck():
+    return JSONResponse(content=get_pool_status())
+
+
+@app.get("/metrics", dependencies=[Depends(get_api_key)])
+def metrics():
+    return PlainTextResponse(render_metrics(get_pool_status()), media_type=CONTENT_TYPE)
+
+
+# Full template of every route, for the request metrics. Routes of an included router only
+# know their path inside it, without the prefix it was mounted at
+ROUTE_PATHS = {
+    id(context.original_route): context.path for context in iter_route_contexts(app.routes)
+}
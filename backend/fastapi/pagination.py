@@ -0,0 +1,92 @@
+import base64
+import binascii
+import json
+from datetime import date
+from typing import Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import BigInteger, Date, Integer, SmallInteger, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Magnitude bits of the integer column types, a cursor value must fit its column
+INTEGER_BITS = {SmallInteger: 15, Integer: 31, BigInteger: 63}
+
+
+class PageParams:
+    """Keyset pagination query parameters shared by the list endpoints."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(
+            None, description=f"Value of the {NEXT_CURSOR_HEADER} header"
+        ),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def encode_cursor(values) -> str:
+    payload = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_value(column, value):
+    """Cursor value as the column's Python type, a ValueError when it cannot be one."""
+    if isinstance(column.type, Date):
+        if not isinstance(value, str):
+            raise ValueError(f"{column.key} must be a date")
+        return date.fromisoformat(value)
+    if isinstance(column.type, Integer):
+        bits = INTEGER_BITS.get(type(column.type), 31)
+        # bool is an int subclass, out-of-range values would fail in the database
+        if type(value) is not int or not -(2**bits) <= value < 2**bits:
+            raise ValueError(f"{column.key} must be an integer")
+        return value
+    if not isinstance(value, column.type.python_type):
+        raise ValueError(f"{column.key} has the wrong type")
+    return value
+
+
+def decode_cursor(cursor: str, columns) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return [_decode_value(column, value) for column, value in zip(columns, values)]
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def paginate(
+    db: AsyncSession,
+    statement,
+    page: PageParams,
+    response: Response,
+    keys: Sequence[Tuple[object, bool]],
+):
+    """Run `statement` ordered by the unique `keys` (column, descending) from the cursor on.
+
+    One extra row is fetched to know whether another page exists; its cursor is returned
+    in the X-Next-Cursor header so the response body stays a plain list.
+    """
+    columns = [column for column, _ in keys]
+    descending = keys[0][1]
+    if page.cursor:
+        key, values = tuple_(*columns), tuple_(*decode_cursor(page.cursor, columns))
+        statement = statement.where(key < values if descending else key > values)
+    statement = statement.order_by(
+        *[column.desc() if desc else column.asc() for column, desc in keys]
+    ).limit(page.limit + 1)
+
+    rows = (await db.scalars(statement)).all()
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(last, column.key) for column in columns]
+        )
+    return rows
@@ -0,0 +1,210 @@
+from typing import List
+
+import common.tasks.models as models
+from bulk import (
+    MAX_BULK_ITEMS,
+    BulkDelete,
+    BulkDeleteResult,
+    BulkItemError,
+    existing_ids,
+    insert_returning,
+)
+from common.database import get_async_db
+from common.tasks.score_store import mark_scores_dirty
+from fastapi import APIRouter, Body, Depends
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from writes import row_values
+
+from . import schemas
+
+router = APIRouter()
+
+# Every bulk endpoint validates the referenced IDs with one IN query per table, writes the
+# valid items with a single statement and commits once. Invalid items are reported by index.
+
+
+async def _updated_rows(db: AsyncSession, model, ids: List[int]) -> list:
+    if not ids:
+        return []
+    statement = select(model).where(model.id.in_(ids)).execution_options(populate_existing=True)
+    rows = {row.id: row for row in (await db.scalars(statement)).all()}
+    return [rows[id_] for id_ in dict.fromkeys(ids)]
+
+
+async def _delete_returning(db: AsyncSession, model, ids: List[int], *columns) -> tuple:
+    deleted = (
+        await db.execute(delete(model).where(model.id.in_(ids)).returning(model.id, *columns))
+    ).all()
+    deleted_ids = {row[0] for row in deleted}
+    errors = [
+        BulkItemError(index=index, detail=f"{model.__name__} not found")
+        for index, id_ in enumerate(ids)
+        if id_ not in deleted_ids
+    ]
+    return deleted, errors
+
+
+# region Tasks
+@router.post("/tasks/bulk", response_model=schemas.TaskBulkResult)
+async def create_tasks(
+    tasks: List[schemas.TaskCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    projects = await existing_ids(db, models.Project.id, (task.project_id for task in tasks))
+
+    rows, errors = [], []
+    for index, task in enumerate(tasks):
+        if task.project_id and task.project_id not in projects:
+            errors.append(BulkItemError(index=index, detail="Project not found"))
+        else:
+            rows.append(row_values(task))
+
+    created = await insert_returning(db, models.Task, rows)
+    mark_scores_dirty(db.sync_session, task_ids=[task.id for task in created])
+    await db.commit()
+    return schemas.TaskBulkResult(items=created, errors=errors)
+
+
+@router.patch("/tasks/bulk", response_model=schemas.TaskBulkResult)
+async def patch_tasks(
+    tasks: List[schemas.TaskBulkUpdate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    found = await existing_ids(db, models.Task.id, (task.id for task in tasks))
+    projects = await existing_ids(db, models.Project.id, (task.project_id for task in tasks))
+
+    rows, errors = [], []
+    for index, task in enumerate(tasks):
+        if task.id not in found:
+            errors.append(BulkItemError(index=index, detail="Task not found"))
+        elif task.project_id and task.project_id not in projects:
+            errors.append(BulkItemError(index=index, detail="Project not found"))
+        else:
+            rows.append(row_values(task))
+
+    if rows:
+        await db.execute(update(models.Task), rows)
+    task_ids = [row["id"] for row in rows]
+    mark_scores_dirty(db.sync_session, task_ids=task_ids)
+    await db.commit()
+    return schemas.TaskBulkResult(
+        items=await _updated_rows(db, models.Task, task_ids), errors=errors
+    )
+
+
+@router.delete("/tasks/bulk", response_model=BulkDeleteResult)
+async def delete_tasks(request: BulkDelete, db: AsyncSession = Depends(get_async_db)):
+    deleted, errors = await _delete_returning(db, models.Task, request.ids)
+    await db.commit()
+    return BulkDeleteResult(deleted=[row.id for row in deleted], errors=errors)
+
+
+# endregion
+
+
+# region TaskPlanning
+@router.post("/task_planning/bulk", response_model=schemas.TaskPlanningBulkResult)
+async def create_task_plannings(
+    task_plannings: List[schemas.TaskPlanningCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    tasks = await existing_ids(
+        db, models.Task.id, (planning.task_id for planning in task_plannings)
+    )
+
+    rows, errors = [], []
+    for index, planning in enumerate(task_plannings):
+        if planning.task_id not in tasks:
+            errors.append(BulkItemError(index=index, detail="Task not found"))
+        else:
+            rows.append(row_values(planning))
+
+    created = await insert_returning(db, models.TaskPlanning, rows)
+    mark_scores_dirty(db.sync_session, task_ids=[planning.task_id for planning in created])
+    await db.commit()
+    return schemas.TaskPlanningBulkResult(items=created, errors=errors)
+
+
+@router.patch("/task_planning/bulk", response_model=schemas.TaskPlanningBulkResult)
+async def patch_task_plannings(
+    task_plannings: List[schemas.TaskPlanningBulkUpdate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # The current task of each planning is loaded too: moving a planning rescores both tasks
+    current_task_ids = dict(
+        (
+            await db.execute(
+                select(models.TaskPlanning.id, models.TaskPlanning.task_id).where(
+                    models.TaskPlanning.id.in_({planning.id for planning in task_plannings})
+                )
+            )
+        ).all()
+    )
+    tasks = await existing_ids(
+        db, models.Task.id, (planning.task_id for planning in task_plannings)
+    )
+
+    rows, errors = [], []
+    for index, planning in enumerate(task_plannings):
+        if planning.id not in current_task_ids:
+            errors.append(BulkItemError(index=index, detail="TaskPlanning not found"))
+        elif planning.task_id and planning.task_id not in tasks:
+            errors.append(BulkItemError(index=index, detail="Task not found"))
+        else:
+            rows.append(row_values(planning))
+
+    if rows:
+        await db.execute(update(models.TaskPlanning), rows)
+    mark_scores_dirty(
+        db.sync_session,
+        task_ids=[current_task_ids[row["id"]] for row in rows]
+        + [row["task_id"] for row in rows if row.get("task_id")],
+    )
+    await db.commit()
+    return schemas.TaskPlanningBulkResult(
+        items=await _updated_rows(db, models.TaskPlanning, [row["id"] for row in rows]),
+        errors=errors,
+    )
+
+
+@router.delete("/task_planning/bulk", response_model=BulkDeleteResult)
+async def delete_task_plannings(request: BulkDelete, db: AsyncSession = Depends(get_async_db)):
+    deleted, errors = await _delete_returning(
+        db, models.TaskPlanning, request.ids, models.TaskPlanning.task_id
+    )
+    mark_scores_dirty(db.sync_session, task_ids=[row.task_id for row in deleted])
+    await db.commit()
+    return BulkDeleteResult(deleted=[row.id for row in deleted], errors=errors)
+
+
+# endregion
+
+
+# region Notes
+@router.post("/notes/bulk", response_model=schemas.NoteBulkResult)
+async def create_notes(
+    notes: List[schemas.NoteCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    tasks = await existing_ids(db, models.Task.id, (note.task_id for note in notes))
+    projects = await existing_ids(db, models.Project.id, (note.project_id for note in notes))
+
+    rows, errors = [], []
+    for index, note in enumerate(notes):
+        if (note.task_id is None) == (note.project_id is None):
+            detail = "Note must belong to either a task or a project"
+            errors.append(BulkItemError(index=index, detail=detail))
+        elif note.task_id and note.task_id not in tasks:
+            errors.append(BulkItemError(index=index, detail="Task not found"))
+        elif note.project_id and note.project_id not in projects:
+            errors.append(BulkItemError(index=index, detail="Project not found"))
+        else:
+            rows.append(row_values(note))
+
+    created = await insert_returning(db, models.Note, rows)
+    await db.commit()
+    return schemas.NoteBulkResult(items=created, errors=errors)
+
+
+# endregion
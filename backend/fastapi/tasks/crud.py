@@ -1,9 +1,16 @@
-from typing import List
+from datetime import date
+from typing import List, Optional
 
 import common.tasks.models as models
-from common.database import get_db
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from common.database import get_async_db
+from common.tasks.enums import ProjectState, TaskState
+from common.tasks.score_store import mark_scores_dirty
+from conditional import not_modified
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pagination import PageParams, paginate
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from writes import insert_one, row_values, update_one
 
 from . import schemas
 
@@ -12,285 +19,215 @@ router = APIRouter()
 
 # region Category
 @router.get("/categories/", response_model=List[schemas.Category])
-def list_categories(db: Session = Depends(get_db)):
-    return db.query(models.Category).all()
+async def list_categories(
+    request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    statement = select(models.Category)
+    cached = await not_modified(request, response, db, statement)
+    if cached:
+        return cached
+    return (await db.scalars(statement)).all()
 
 
 @router.get("/categories/{category_id}", response_model=schemas.Category)
-def get_category(category_id: int, db: Session = Depends(get_db)):
-    category = db.query(models.Category).filter(models.Category.id == category_id).first()
+async def get_category(
+    category_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    cached = await not_modified(
+        request, response, db, select(models.Category).where(models.Category.id == category_id)
+    )
+    if cached:
+        return cached
+    category = await db.get(models.Category, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     return category
 
 
 @router.post("/categories/", response_model=schemas.Category)
-def create_category(category: schemas.CategoryCreate, db: Session = Depends(get_db)):
-    # Validate parent category exists if provided
-    if category.parent_category_id:
-        parent_category = (
-            db.query(models.Category)
-            .filter(models.Category.id == category.parent_category_id)
-            .first()
-        )
-        if not parent_category:
-            raise HTTPException(status_code=400, detail="Parent category not found")
-
-    # Check if category name already exists
-    existing_category = (
-        db.query(models.Category).filter(models.Category.name == category.name).first()
-    )
-    if existing_category:
-        raise HTTPException(status_code=400, detail="Category name already exists")
-
-    # Create category data, excluding None values to let model defaults apply
-    category_data = category.dict(exclude_unset=True)
-    try:
-        db_category = models.Category(**category_data)
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
-    db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+async def create_category(
+    category: schemas.CategoryCreate, db: AsyncSession = Depends(get_async_db)
+):
+    # Parent category and name uniqueness are checked by the table constraints
+    db_category = await insert_one(db, models.Category, row_values(category))
+    await db.commit()
     return db_category
 
 
 @router.put("/categories/{category_id}", response_model=schemas.Category)
-def update_category(
-    category_id: int, category_data: schemas.CategoryUpdate, db: Session = Depends(get_db)
+async def update_category(
+    category_id: int,
+    category_data: schemas.CategoryUpdate,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    db_category = db.query(models.Category).filter(models.Category.id == category_id).first()
+    db_category = await update_one(
+        db,
+        models.Category,
+        row_values(category_data),
+        models.Category.id == category_id,
+    )
     if not db_category:
         raise HTTPException(status_code=404, detail="Category not found")
-
-    # Validate parent category exists if provided
-    if category_data.parent_category_id:
-        parent_category = (
-            db.query(models.Category)
-            .filter(models.Category.id == category_data.parent_category_id)
-            .first()
-        )
-        if not parent_category:
-            raise HTTPException(status_code=400, detail="Parent category not found")
-
-    # Check if category name already exists (excluding current category)
-    if category_data.name:
-        existing_category = (
-            db.query(models.Category)
-            .filter(models.Category.name == category_data.name, models.Category.id != category_id)
-            .first()
-        )
-        if existing_category:
-            raise HTTPException(status_code=400, detail="Category name already exists")
-
-    update_data = category_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_category, key, value)
-
-    try:
-        db.commit()
-        db.refresh(db_category)
-    except ValueError as ve:
-        db.rollback()
-        raise HTTPException(status_code=400, detail=str(ve))
+    await db.commit()
     return db_category
 
 
 @router.delete("/categories/{category_id}")
-def delete_category(category_id: int, db: Session = Depends(get_db)):
-    category = db.query(models.Category).filter(models.Category.id == category_id).first()
+async def delete_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
+    category = await db.get(models.Category, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
-    db.delete(category)
-    db.commit()
+    await db.delete(category)
+    await db.commit()
     return {"message": "Category deleted successfully"}
 
 
 # endregion
 # region Project
 @router.get("/projects/", response_model=List[schemas.Project])
-def list_projects(db: Session = Depends(get_db)):
-    return db.query(models.Project).all()
+async def list_projects(
+    request: Request,
+    response: Response,
+    state: Optional[ProjectState] = None,
+    category_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    statement = select(models.Project)
+    if state:
+        statement = statement.where(models.Project.state == state.value)
+    if category_id:
+        statement = statement.where(models.Project.category_id == category_id)
+    cached = await not_modified(request, response, db, statement)
+    if cached:
+        return cached
+    return await paginate(db, statement, page, response, keys=[(models.Project.id, False)])
 
 
 @router.get("/projects/{project_id}", response_model=schemas.Project)
-def get_project(project_id: int, db: Session = Depends(get_db)):
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+async def get_project(
+    project_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    cached = await not_modified(
+        request, response, db, select(models.Project).where(models.Project.id == project_id)
+    )
+    if cached:
+        return cached
+    project = await db.get(models.Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
 
 
 @router.post("/projects/", response_model=schemas.Project)
-def create_project(project: schemas.ProjectCreate, db: Session = Depends(get_db)):
-    # Validate category exists if provided
-    if project.category_id:
-        category = (
-            db.query(models.Category).filter(models.Category.id == project.category_id).first()
-        )
-        if not category:
-            raise HTTPException(status_code=400, detail="Category not found")
-
-    # Check if project name already exists
-    existing_project = db.query(models.Project).filter(models.Project.name == project.name).first()
-    if existing_project:
-        raise HTTPException(status_code=400, detail="Project name already exists")
-
-    # Create project data, excluding None values to let model defaults apply
-    project_data = project.dict(exclude_unset=True)
-
-    try:
-        db_project = models.Project(**project_data)
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
-    db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+async def create_project(project: schemas.ProjectCreate, db: AsyncSession = Depends(get_async_db)):
+    # Category and name uniqueness are checked by the table constraints
+    db_project = await insert_one(db, models.Project, row_values(project))
+    await db.commit()
     return db_project
 
 
 @router.put("/projects/{project_id}", response_model=schemas.Project)
-def update_project(
-    project_id: int, project_data: schemas.ProjectUpdate, db: Session = Depends(get_db)
+async def update_project(
+    project_id: int, project_data: schemas.ProjectUpdate, db: AsyncSession = Depends(get_async_db)
 ):
-    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    db_project = await update_one(
+        db, models.Project, row_values(project_data), models.Project.id == project_id
+    )
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
-
-    # Validate category exists if provided
-    if project_data.category_id:
-        category = (
-            db.query(models.Category).filter(models.Category.id == project_data.category_id).first()
-        )
-        if not category:
-            raise HTTPException(status_code=400, detail="Category not found")
-
-    # Check if project name already exists (excluding current project)
-    if project_data.name:
-        existing_project = (
-            db.query(models.Project)
-            .filter(models.Project.name == project_data.name, models.Project.id != project_id)
-            .first()
-        )
-        if existing_project:
-            raise HTTPException(status_code=400, detail="Project name already exists")
-
-    update_data = project_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_project, key, value)
-
-    try:
-        db.commit()
-        db.refresh(db_project)
-    except ValueError as ve:
-        db.rollback()
-        raise HTTPException(status_code=400, detail=str(ve))
+    mark_scores_dirty(db.sync_session, project_ids=[project_id])
+    await db.commit()
     return db_project
 
 
 @router.delete("/projects/{project_id}")
-def delete_project(project_id: int, db: Session = Depends(get_db)):
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+async def delete_project(project_id: int, db: AsyncSession = Depends(get_async_db)):
+    project = await db.get(models.Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
     return {"message": "Project deleted successfully"}
 
 
 # region Tasks
 @router.get("/tasks/", response_model=List[schemas.Task])
-def list_tasks(db: Session = Depends(get_db)):
-    return db.query(models.Task).all()
+async def list_tasks(
+    request: Request,
+    response: Response,
+    project_id: Optional[int] = None,
+    state: Optional[List[TaskState]] = Query(None),
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    statement = select(models.Task)
+    if project_id:
+        statement = statement.where(models.Task.project_id == project_id)
+    if state:
+        statement = statement.where(models.Task.state.in_([s.value for s in state]))
+    if due_from:
+        statement = statement.where(models.Task.due_date >= due_from)
+    if due_to:
+        statement = statement.where(models.Task.due_date <= due_to)
+    cached = await not_modified(request, response, db, statement)
+    if cached:
+        return cached
+    return await paginate(db, statement, page, response, keys=[(models.Task.id, False)])
 
 
 @router.get("/tasks/{task_id}", response_model=schemas.Task)
-def get_task(task_id: int, db: Session = Depends(get_db)):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+async def get_task(
+    task_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    cached = await not_modified(
+        request, response, db, select(models.Task).where(models.Task.id == task_id)
+    )
+    if cached:
+        return cached
+    task = await db.get(models.Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
 
 
 @router.post("/tasks/", response_model=schemas.Task)
-def create_task(task: schemas.TaskCreate, db: Session = Depends(get_db)):
-    # Validate project exists if provided
-    if task.project_id:
-        project = db.query(models.Project).filter(models.Project.id == task.project_id).first()
-        if not project:
-            raise HTTPException(status_code=400, detail="Project not found")
-
-    # Create task data, excluding None values to let model defaults apply
-    task_data = task.dict(exclude_unset=True)
-
-    try:
-        db_task = models.Task(**task_data)
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
-    db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+async def create_task(task: schemas.TaskCreate, db: AsyncSession = Depends(get_async_db)):
+    # The project is checked by the foreign key
+    db_task = await insert_one(db, models.Task, row_values(task))
+    mark_scores_dirty(db.sync_session, task_ids=[db_task.id])
+    await db.commit()
     return db_task
 
 
 @router.put("/tasks/{task_id}", response_model=schemas.Task)
-def update_task(task_id: int, task_data: schemas.TaskUpdate, db: Session = Depends(get_db)):
-    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
+async def update_task(
+    task_id: int, task_data: schemas.TaskUpdate, db: AsyncSession = Depends(get_async_db)
+):
+    db_task = await update_one(db, models.Task, row_values(task_data), models.Task.id == task_id)
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
-
-    # Validate project exists if provided
-    if task_data.project_id:
-        project = db.query(models.Project).filter(models.Project.id == task_data.project_id).first()
-        if not project:
-            raise HTTPException(status_code=400, detail="Project not found")
-
-    update_data = task_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_task, key, value)
-
-    try:
-        db.commit()
-        db.refresh(db_task)
-    except ValueError as ve:
-        db.rollback()
-        raise HTTPException(status_code=400, detail=str(ve))
+    mark_scores_dirty(db.sync_session, task_ids=[task_id])
+    await db.commit()
     return db_task
 
 
 @router.patch("/tasks/{task_id}", response_model=schemas.Task)
-def patch_task(task_id: int, task_data: schemas.TaskUpdate, db: Session = Depends(get_db)):
-    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if not db_task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    # Validate project exists if provided
-    if task_data.project_id:
-        project = db.query(models.Project).filter(models.Project.id == task_data.project_id).first()
-        if not project:
-            raise HTTPException(status_code=400, detail="Project not found")
-
-    # Only update fields that are provided (exclude_unset=True)
-    update_data = task_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_task, key, value)
-
-    try:
-        db.commit()
-        db.refresh(db_task)
-    except ValueError as ve:
-        db.rollback()
-        raise HTTPException(status_code=400, detail=str(ve))
-    return db_task
+async def patch_task(
+    task_id: int, task_data: schemas.TaskUpdate, db: AsyncSession = Depends(get_async_db)
+):
+    return await update_task(task_id, task_data, db)
 
 
 @router.delete("/tasks/{task_id}")
-def delete_task(task_id: int, db: Session = Depends(get_db)):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    task = await db.get(models.Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await db.commit()
     return {"message": "Task deleted successfully"}
 
 
@@ -299,112 +236,109 @@ def delete_task(task_id: int, db: Session = Depends(get_db)):
 
 # region TaskPlanning
 @router.get("/task_planning/", response_model=List[schemas.TaskPlanning])
-def list_task_plannings(db: Session = Depends(get_db)):
-    return db.query(models.TaskPlanning).all()
+async def list_task_plannings(
+    request: Request,
+    response: Response,
+    task_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    done: Optional[bool] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    statement = select(models.TaskPlanning)
+    if task_id:
+        statement = statement.where(models.TaskPlanning.task_id == task_id)
+    if date_from:
+        statement = statement.where(models.TaskPlanning.planned_date >= date_from)
+    if date_to:
+        statement = statement.where(models.TaskPlanning.planned_date <= date_to)
+    if done is not None:
+        statement = statement.where(models.TaskPlanning.done == done)
+    keys = [(models.TaskPlanning.planned_date, False), (models.TaskPlanning.id, False)]
+    cached = await not_modified(request, response, db, statement)
+    if cached:
+        return cached
+    return await paginate(db, statement, page, response, keys=keys)
 
 
 @router.get("/task_planning/{task_planning_id}", response_model=schemas.TaskPlanning)
-def get_task_planning(task_planning_id: int, db: Session = Depends(get_db)):
-    task_planning = (
-        db.query(models.TaskPlanning).filter(models.TaskPlanning.id == task_planning_id).first()
+async def get_task_planning(
+    task_planning_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    cached = await not_modified(
+        request,
+        response,
+        db,
+        select(models.TaskPlanning).where(models.TaskPlanning.id == task_planning_id),
     )
+    if cached:
+        return cached
+    task_planning = await db.get(models.TaskPlanning, task_planning_id)
     if not task_planning:
         raise HTTPException(status_code=404, detail="TaskPlanning not found")
     return task_planning
 
 
 @router.post("/task_planning/", response_model=schemas.TaskPlanning)
-def create_task_planning(task_planning: schemas.TaskPlanningCreate, db: Session = Depends(get_db)):
-    # Validate task exists
-    task = db.query(models.Task).filter(models.Task.id == task_planning.task_id).first()
-    if not task:
-        raise HTTPException(status_code=400, detail="Task not found")
-
-    # Create task planning data, excluding None values to let model defaults apply
-    task_planning_data = task_planning.dict(exclude_unset=True)
-
-    try:
-        db_task_planning = models.TaskPlanning(**task_planning_data)
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
-    db.add(db_task_planning)
-    db.commit()
-    db.refresh(db_task_planning)
+async def create_task_planning(
+    task_planning: schemas.TaskPlanningCreate, db: AsyncSession = Depends(get_async_db)
+):
+    # The task is checked by the foreign key
+    db_task_planning = await insert_one(db, models.TaskPlanning, row_values(task_planning))
+    mark_scores_dirty(db.sync_session, task_ids=[db_task_planning.task_id])
+    await db.commit()
     return db_task_planning
 
 
 @router.put("/task_planning/{task_planning_id}", response_model=schemas.TaskPlanning)
-def update_task_planning(
+async def update_task_planning(
     task_planning_id: int,
     task_planning_data: schemas.TaskPlanningUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    db_task_planning = (
-        db.query(models.TaskPlanning).filter(models.TaskPlanning.id == task_planning_id).first()
+    update_data = row_values(task_planning_data)
+
+    # Moving a planning to another task also changes the score of its current task
+    task_ids = []
+    if "task_id" in update_data:
+        task_ids = (
+            await db.scalars(
+                select(models.TaskPlanning.task_id).where(
+                    models.TaskPlanning.id == task_planning_id
+                )
+            )
+        ).all()
+
+    db_task_planning = await update_one(
+        db, models.TaskPlanning, update_data, models.TaskPlanning.id == task_planning_id
     )
     if not db_task_planning:
         raise HTTPException(status_code=404, detail="TaskPlanning not found")
-
-    # Validate task exists if provided
-    if task_planning_data.task_id:
-        task = db.query(models.Task).filter(models.Task.id == task_planning_data.task_id).first()
-        if not task:
-            raise HTTPException(status_code=400, detail="Task not found")
-
-    update_data = task_planning_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_task_planning, key, value)
-
-    try:
-        db.commit()
-        db.refresh(db_task_planning)
-    except ValueError as ve:
-        db.rollback()
-        raise HTTPException(status_code=400, detail=str(ve))
+    mark_scores_dirty(db.sync_session, task_ids=[db_task_planning.task_id, *task_ids])
+    await db.commit()
     return db_task_planning
 
 
 @router.patch("/task_planning/{task_planning_id}", response_model=schemas.TaskPlanning)
-def patch_task_planning(
+async def patch_task_planning(
     task_planning_id: int,
     task_planning_data: schemas.TaskPlanningUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    db_task_planning = (
-        db.query(models.TaskPlanning).filter(models.TaskPlanning.id == task_planning_id).first()
-    )
-    if not db_task_planning:
-        raise HTTPException(status_code=404, detail="TaskPlanning not found")
-
-    # Validate task exists if provided
-    if task_planning_data.task_id:
-        task = db.query(models.Task).filter(models.Task.id == task_planning_data.task_id).first()
-        if not task:
-            raise HTTPException(status_code=400, detail="Task not found")
-
-    # Only update fields that are provided (exclude_unset=True)
-    update_data = task_planning_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_task_planning, key, value)
-
-    try:
-        db.commit()
-        db.refresh(db_task_planning)
-    except ValueError as ve:
-        db.rollback()
-        raise HTTPException(status_code=400, detail=str(ve))
-    return db_task_planning
+    return await update_task_planning(task_planning_id, task_planning_data, db)
 
 
 @router.delete("/task_planning/{task_planning_id}")
-def delete_task_planning(task_planning_id: int, db: Session = Depends(get_db)):
-    task_planning = (
-        db.query(models.TaskPlanning).filter(models.TaskPlanning.id == task_planning_id).first()
-    )
+async def delete_task_planning(task_planning_id: int, db: AsyncSession = Depends(get_async_db)):
+    task_planning = await db.get(models.TaskPlanning, task_planning_id)
     if not task_planning:
         raise HTTPException(status_code=404, detail="TaskPlanning not found")
-    db.delete(task_planning)
-    db.commit()
+    await db.delete(task_planning)
+    await db.commit()
     return {"message": "TaskPlanning deleted successfully"}
 
 
@@ -414,79 +348,66 @@ def delete_task_planning(task_planning_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/notes/", response_model=List[schemas.Note])
-def list_notes(db: Session = Depends(get_db)):
-    return db.query(models.Note).all()
+async def list_notes(
+    request: Request,
+    response: Response,
+    task_id: Optional[int] = None,
+    project_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    statement = select(models.Note)
+    if task_id:
+        statement = statement.where(models.Note.task_id == task_id)
+    if project_id:
+        statement = statement.where(models.Note.project_id == project_id)
+    cached = await not_modified(request, response, db, statement)
+    if cached:
+        return cached
+    return await paginate(db, statement, page, response, keys=[(models.Note.id, False)])
 
 
 @router.get("/notes/{note_id}", response_model=schemas.Note)
-def get_note(note_id: int, db: Session = Depends(get_db)):
-    note = db.query(models.Note).filter(models.Note.id == note_id).first()
+async def get_note(
+    note_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    cached = await not_modified(
+        request, response, db, select(models.Note).where(models.Note.id == note_id)
+    )
+    if cached:
+        return cached
+    note = await db.get(models.Note, note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     return note
 
 
 @router.post("/notes/", response_model=schemas.Note)
-def create_note(note: schemas.NoteCreate, db: Session = Depends(get_db)):
-    # Validate task or project exists if provided
-    if note.task_id:
-        task = db.query(models.Task).filter(models.Task.id == note.task_id).first()
-        if not task:
-            raise HTTPException(status_code=400, detail="Task not found")
-    elif note.project_id:
-        project = db.query(models.Project).filter(models.Project.id == note.project_id).first()
-        if not project:
-            raise HTTPException(status_code=400, detail="Project not found")
-
-    # Create note data, excluding None values to let model defaults apply
-    note_data = note.dict(exclude_unset=True)
-
-    try:
-        db_note = models.Note(**note_data)
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
-    db.add(db_note)
-    db.commit()
-    db.refresh(db_note)
+async def create_note(note: schemas.NoteCreate, db: AsyncSession = Depends(get_async_db)):
+    # The task or project is checked by the foreign keys
+    db_note = await insert_one(db, models.Note, row_values(note))
+    await db.commit()
     return db_note
 
 
 @router.put("/notes/{note_id}", response_model=schemas.Note)
-def update_note(note_id: int, note_data: schemas.NoteUpdate, db: Session = Depends(get_db)):
-    db_note = db.query(models.Note).filter(models.Note.id == note_id).first()
+async def update_note(
+    note_id: int, note_data: schemas.NoteUpdate, db: AsyncSession = Depends(get_async_db)
+):
+    db_note = await update_one(db, models.Note, row_values(note_data), models.Note.id == note_id)
     if not db_note:
         raise HTTPException(status_code=404, detail="Note not found")
-
-    # Validate task or project exists if provided
-    if note_data.task_id:
-        task = db.query(models.Task).filter(models.Task.id == note_data.task_id).first()
-        if not task:
-            raise HTTPException(status_code=400, detail="Task not found")
-    elif note_data.project_id:
-        project = db.query(models.Project).filter(models.Project.id == note_data.project_id).first()
-        if not project:
-            raise HTTPException(status_code=400, detail="Project not found")
-
-    update_data = note_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_note, key, value)
-
-    try:
-        db.commit()
-        db.refresh(db_note)
-    except ValueError as ve:
-        db.rollback()
-        raise HTTPException(status_code=400, detail=str(ve))
+    await db.commit()
     return db_note
 
 
 @router.delete("/notes/{note_id}")
-def delete_note(note_id: int, db: Session = Depends(get_db)):
-    note = db.query(models.Note).filter(models.Note.id == note_id).first()
+async def delete_note(note_id: int, db: AsyncSession = Depends(get_async_db)):
+    note = await db.get(models.Note, note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
-    db.delete(note)
-    db.commit()
+    await db.delete(note)
+    await db.commit()
     return {"message": "Note deleted successfully"}
 
 
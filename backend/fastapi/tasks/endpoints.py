@@ -1,63 +1,90 @@
 from datetime import datetime, timedelta
+from itertools import chain
 
 import common.tasks.models as models
-from common.database import get_db
-from common.tasks.recommendations import (
-    get_task_recommendations as get_common_task_recommendations,
-)
+from common.database import get_async_db
+from common.tasks.backends import recommendation_backend
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import JSON, bindparam, func, literal_column, select, type_coerce
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import schemas
 
 router = APIRouter()
 
 
-@router.get("/tasks/{task_id}/general-info", response_model=schemas.TaskGeneralInfo)
-def get_task_general_info(task_id: int, db: Session = Depends(get_db)):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+def _json_object(*columns):
+    return func.json_build_object(*chain.from_iterable((column.key, column) for column in columns))
+
+
+def _schema_columns(model, schema):
+    return [getattr(model, name) for name in schema.model_fields]
 
-    # Get project
-    project = db.query(models.Project).filter(models.Project.id == task.project_id).first()
 
-    # Get last 5 notes
-    last_notes = (
-        db.query(models.Note)
-        .filter(models.Note.task_id == task_id)
+def _json_list(subquery, *order_by):
+    """JSON array of the subquery rows, '[]' instead of NULL when it is empty."""
+    rows = func.json_agg(aggregate_order_by(_json_object(*subquery.c), *order_by))
+    return select(func.coalesce(rows, literal_column("'[]'::json"))).scalar_subquery()
+
+
+def _general_info_statement():
+    """Task row plus its project, last 5 notes and next-week plannings as JSON columns."""
+    task_id = bindparam("task_id")
+    project = (
+        select(_json_object(*_schema_columns(models.Project, schemas.ProjectBase)))
+        .where(models.Project.id == models.Task.project_id)
+        .scalar_subquery()
+    )
+    notes = (
+        select(*_schema_columns(models.Note, schemas.NoteBase), models.Note.updated_at)
+        .where(models.Note.task_id == task_id)
         .order_by(models.Note.updated_at.desc())
         .limit(5)
-        .all()
+        .subquery()
     )
-    if not last_notes:
-        last_notes = []
-
-    # Get next week plannings
-    today = datetime.utcnow().date()
-    next_week = today + timedelta(days=7)
-    next_plannings = (
-        db.query(models.TaskPlanning)
-        .filter(
+    plannings = (
+        select(*_schema_columns(models.TaskPlanning, schemas.TaskPlanningBase))
+        .where(
             models.TaskPlanning.task_id == task_id,
-            models.TaskPlanning.planned_date >= today,
-            models.TaskPlanning.planned_date <= next_week,
+            models.TaskPlanning.planned_date >= bindparam("date_from"),
+            models.TaskPlanning.planned_date <= bindparam("date_to"),
         )
-        .all()
+        .subquery()
     )
+    return select(
+        models.Task,
+        type_coerce(project, JSON).label("project"),
+        type_coerce(_json_list(notes, notes.c.updated_at.desc()), JSON).label("last_notes"),
+        type_coerce(
+            _json_list(plannings, plannings.c.planned_date, plannings.c.start_hour), JSON
+        ).label("next_plannings"),
+    ).where(models.Task.id == task_id)
+
+
+# Built once: constructing the statement costs more than running it
+GENERAL_INFO_STATEMENT = _general_info_statement()
+
+
+@router.get("/tasks/{task_id}/general-info", response_model=schemas.TaskGeneralInfo)
+async def get_task_general_info(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    # One round trip: related rows are aggregated to JSON by PostgreSQL
+    today = datetime.utcnow().date()
+    params = {"task_id": task_id, "date_from": today, "date_to": today + timedelta(days=7)}
+    row = (await db.execute(GENERAL_INFO_STATEMENT, params)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Task not found")
 
-    task_info = schemas.TaskGeneralInfo(
+    task, project, last_notes, next_plannings = row
+    return schemas.TaskGeneralInfo(
         **task.__dict__,
-        project=schemas.ProjectBase(**project.__dict__) if project else None,
-        last_notes=[schemas.NoteBase(**note.__dict__) for note in last_notes],
-        next_plannings=[
-            schemas.TaskPlanningBase(**planning.__dict__) for planning in next_plannings
-        ],
+        project=project,
+        last_notes=last_notes,
+        next_plannings=next_plannings,
     )
-    return task_info
 
 
 @router.get("/tasks/recommendations", response_model=list[schemas.TaskRecommendation])
-def get_task_recommendations(db: Session = Depends(get_db)):
-    recommendations = get_common_task_recommendations(db)
+async def get_task_recommendations(db: AsyncSession = Depends(get_async_db)):
+    recommendations = await db.run_sync(recommendation_backend())
     return [schemas.TaskRecommendation(task=r["task"], score=r["score"]) for r in recommendations]
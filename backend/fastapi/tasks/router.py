@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from .bulk import router as bulk_router
 from .crud import router as crud_router
 from .endpoints import router as endpoints_router
 
@@ -7,4 +8,6 @@ router = APIRouter()
 
 # Include all CRUD operations from main.py
 router.include_router(endpoints_router, tags=["tasks"])
+# Before the CRUD routes, so "/tasks/bulk" is not matched as "/tasks/{task_id}"
+router.include_router(bulk_router, tags=["bulk"])
 router.include_router(crud_router, tags=["CRUD"])
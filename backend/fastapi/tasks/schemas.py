@@ -1,6 +1,7 @@
 from datetime import date, datetime, time
-from typing import Optional
+from typing import List, Optional
 
+from bulk import BulkItemError
 from common.tasks.constants import (
     MAX_PRIORITY,
     MIN_PRIORITY,
@@ -189,3 +190,30 @@ class TaskRecommendation(BaseModel):
 
 
 # endregion
+
+
+# region Bulk
+class TaskBulkUpdate(TaskUpdate):
+    id: int
+
+
+class TaskPlanningBulkUpdate(TaskPlanningUpdate):
+    id: int
+
+
+class TaskBulkResult(BaseModel):
+    items: List[Task] = []
+    errors: List[BulkItemError] = []
+
+
+class TaskPlanningBulkResult(BaseModel):
+    items: List[TaskPlanning] = []
+    errors: List[BulkItemError] = []
+
+
+class NoteBulkResult(BaseModel):
+    items: List[Note] = []
+    errors: List[BulkItemError] = []
+
+
+# endregion
@@ -0,0 +1,78 @@
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Referenced rows and unique fields are validated by the database constraints instead of a
+# SELECT per check; a violation is reported with the message of the constraint it broke.
+CONSTRAINT_ERRORS = {
+    "category_name_key": (400, "Category name already exists"),
+    "category_parent_category_id_fkey": (400, "Parent category not found"),
+    "project_name_key": (400, "Project name already exists"),
+    "project_category_id_fkey": (400, "Category not found"),
+    "task_project_id_fkey": (400, "Project not found"),
+    "task_planning_task_id_fkey": (400, "Task not found"),
+    "note_task_id_fkey": (400, "Task not found"),
+    "note_project_id_fkey": (400, "Project not found"),
+    "project_or_task_id_check": (400, "Note must belong to either a task or a project"),
+    "daily_insights_date_type_key": (400, "Insight for this date and type already exists"),
+    "habit_entry_habit_id_date_key": (400, "Entry for this date already exists"),
+    "metric_entry_metric_id_date_key": (400, "Entry for this date already exists"),
+    # Parents taken from the URL path
+    "habit_entry_habit_id_fkey": (404, "Habit not found"),
+    "metric_entry_metric_id_fkey": (404, "Metric not found"),
+}
+
+
+def _constraint_name(error: IntegrityError) -> Optional[str]:
+    # asyncpg exposes the violated constraint on the exception wrapped by the DBAPI adapter
+    return getattr(error.orig.__cause__, "constraint_name", None)
+
+
+@asynccontextmanager
+async def constraint_errors(db: AsyncSession):
+    try:
+        yield
+    except IntegrityError as error:
+        await db.rollback()
+        constraint = _constraint_name(error)
+        if constraint not in CONSTRAINT_ERRORS:
+            raise
+        status_code, detail = CONSTRAINT_ERRORS[constraint]
+        raise HTTPException(status_code=status_code, detail=detail)
+
+
+def row_values(item: BaseModel, **values) -> dict:
+    """Column values of a create or update payload, shared by the single and bulk endpoints.
+
+    Only the fields the client sent are written, so omitted ones keep their column defaults,
+    enums are stored as their values, and `values` adds columns taken from the URL path.
+    """
+    row = {
+        name: value.value if isinstance(value, Enum) else value
+        for name, value in item.dict(exclude_unset=True).items()
+    }
+    row.update(values)
+    return row
+
+
+async def insert_one(db: AsyncSession, model, values: dict):
+    """INSERT ... RETURNING the new row in a single statement."""
+    async with constraint_errors(db):
+        return (await db.scalars(insert(model).values(**values).returning(model))).one()
+
+
+async def update_one(db: AsyncSession, model, values: dict, *criteria):
+    """UPDATE ... RETURNING the row matching `criteria`, or None when there is none."""
+    if values:
+        statement = update(model).where(*criteria).values(**values).returning(model)
+    else:
+        statement = select(model).where(*criteria)
+    async with constraint_errors(db):
+        result = await db.scalars(statement.execution_options(populate_existing=True))
+        return result.one_or_none()
@@ -0,0 +1,156 @@
+import os
+import time
+from concurrent import futures
+
+import requests
+from asgi_bridge import ASGIBridge, import_fastapi_main
+from common.metrics import proxy_upstream_seconds
+from flask import Response, jsonify, request
+from requests.adapters import HTTPAdapter
+
+STREAM_CHUNK_SIZE = 64 * 1024
+# Backend response headers passed back to the browser along with the raw body
+FORWARDED_HEADERS = (
+    "Content-Type",
+    "Content-Encoding",
+    "Content-Length",
+    "X-Next-Cursor",
+    "ETag",
+    "Last-Modified",
+    "Cache-Control",
+)
+
+_session = None
+_bridge = None
+
+
+def get_api_session() -> requests.Session:
+    """Keep-alive session to the FastAPI backend shared by every proxied call."""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=int(os.getenv("API_POOL_SIZE", "10")))
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["X-API-Key"] = os.getenv("FASTAPI_API_KEY")
+        _session = session
+    return _session
+
+
+def get_api_bridge() -> ASGIBridge:
+    """In-process bridge to the FastAPI app, for deployments that ship both backends."""
+    global _bridge
+    if _bridge is None:
+        app_dir = os.getenv("FASTAPI_APP_DIR") or os.path.join(
+            os.path.dirname(__file__), "..", "fastapi"
+        )
+        try:
+            fastapi_main = import_fastapi_main(app_dir)
+        except (ImportError, OSError) as e:
+            raise RuntimeError(
+                f"API_TRANSPORT=inprocess could not import the FastAPI app from {app_dir}: {e}. "
+                "Set FASTAPI_APP_DIR to its source directory and install fastapi/requirements.txt"
+            ) from e
+        # Calls come from this process, after the Flask login check
+        fastapi_main.app.dependency_overrides[fastapi_main.get_api_key] = lambda: None
+        _bridge = ASGIBridge(fastapi_main.app)
+    return _bridge
+
+
+def _api_url(path):
+    api_url = os.getenv("API_BASE_URL", "http://localhost:8001")
+    if not api_url.startswith("http"):
+        api_url = f"http://{api_url}"
+    return f"{api_url}/{path}"
+
+
+def _timeout():
+    # (connect, read) in seconds
+    return (
+        float(os.getenv("API_CONNECT_TIMEOUT", "3")),
+        float(os.getenv("API_READ_TIMEOUT", "30")),
+    )
+
+
+def _stream_body(upstream):
+    try:
+        # Bytes are relayed as received, still compressed if the backend compressed them
+        yield from upstream.raw.stream(STREAM_CHUNK_SIZE, decode_content=False)
+    finally:
+        upstream.close()
+
+
+def _dispatch_in_process(path):
+    headers = [(b"accept-encoding", request.headers.get("Accept-Encoding", "identity").encode())]
+    if request.content_type:
+        headers.append((b"content-type", request.content_type.encode()))
+    if "If-None-Match" in request.headers:
+        headers.append((b"if-none-match", request.headers["If-None-Match"].encode()))
+
+    start = time.perf_counter()
+    try:
+        status, response_headers, chunks = get_api_bridge().request(
+            request.method,
+            f"/{path}",
+            query_string=request.query_string,
+            headers=headers,
+            body=request.get_data(),
+            timeout=_timeout()[1],
+        )
+    except futures.TimeoutError:
+        proxy_upstream_seconds.observe(time.perf_counter() - start, "inprocess", "timeout")
+        return jsonify({"error": "Backend timed out"}), 504
+    proxy_upstream_seconds.observe(time.perf_counter() - start, "inprocess", str(status))
+
+    if status == 204:
+        chunks.close()
+        return "", status
+    response_headers = {name.decode().lower(): value.decode() for name, value in response_headers}
+    forwarded = {
+        name: response_headers[name.lower()]
+        for name in FORWARDED_HEADERS
+        if name.lower() in response_headers
+    }
+    # Streamed like the HTTP transport, so event streams are relayed as they happen
+    return Response(chunks, status=status, headers=forwarded)
+
+
+def proxy_api_request(path):
+    """Relay the current request to the FastAPI backend without decoding either body."""
+    if os.getenv("API_TRANSPORT", "http") == "inprocess":
+        return _dispatch_in_process(path)
+
+    # Only ask for encodings the browser accepts, the body is not re-encoded here
+    headers = {"Accept-Encoding": request.headers.get("Accept-Encoding", "identity")}
+    if request.content_type:
+        headers["Content-Type"] = request.content_type
+    if "If-None-Match" in request.headers:
+        headers["If-None-Match"] = request.headers["If-None-Match"]
+
+    start = time.perf_counter()
+    try:
+        upstream = get_api_session().request(
+            method=request.method,
+            url=_api_url(path),
+            headers=headers,
+            params=list(request.args.items(multi=True)),
+            data=request.get_data() or None,
+            timeout=_timeout(),
+            stream=True,
+        )
+    except requests.exceptions.Timeout as e:
+        proxy_upstream_seconds.observe(time.perf_counter() - start, "http", "timeout")
+        return jsonify({"error": str(e)}), 504
+    except requests.exceptions.RequestException as e:
+        proxy_upstream_seconds.observe(time.perf_counter() - start, "http", "error")
+        return jsonify({"error": str(e)}), 500
+    # Time to the response headers, the body is streamed afterwards
+    proxy_upstream_seconds.observe(time.perf_counter() - start, "http", str(upstream.status_code))
+
+    if upstream.status_code == 204:
+        upstream.close()
+        return "", upstream.status_code
+    forwarded = {
+        name: upstream.headers[name] for name in FORWARDED_HEADERS if name in upstream.headers
+    }
+    return Response(_stream_body(upstream), status=upstream.status_code, headers=forwarded)
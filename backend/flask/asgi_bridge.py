@@ -0,0 +1,139 @@
+import asyncio
+import importlib
+import os
+import queue
+import sys
+import threading
+from concurrent import futures
+
+
+class ASGIBridge:
+    """Calls an ASGI app synchronously, running it on a private event loop thread.
+
+    The loop lives as long as the process so the app's async connection pool, which is bound
+    to the loop that created it, is reused across calls.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name="asgi-bridge", daemon=True).start()
+
+    def request(self, method, path, query_string=b"", headers=(), body=b"", timeout=None):
+        """Start one HTTP request and return (status, headers, body chunks) of the response.
+
+        The chunks are a generator fed while the app runs, so streaming responses such as
+        the change feed are relayed as they are produced. Waiting longer than `timeout` for
+        the response start or for the next chunk raises futures.TimeoutError; the call is
+        cancelled then, and when the generator is closed before the end of the body.
+        """
+        messages = queue.Queue()
+        call = asyncio.run_coroutine_threadsafe(
+            self._call(method, path, query_string, list(headers), body, messages.put), self.loop
+        )
+        try:
+            status, response_headers = self._next_message(messages, timeout)
+        except BaseException:
+            call.cancel()
+            raise
+        return status, response_headers, self._body(messages, call, timeout)
+
+    @staticmethod
+    def _next_message(messages, timeout):
+        try:
+            message = messages.get(timeout=timeout)
+        except queue.Empty:
+            raise futures.TimeoutError()
+        if isinstance(message, BaseException):
+            raise message
+        return message
+
+    def _body(self, messages, call, timeout):
+        try:
+            while True:
+                chunk = self._next_message(messages, timeout)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            # No-op once the app returned, otherwise stops a response the client left
+            call.cancel()
+
+    async def _call(self, method, path, query_string, headers, body, put):
+        """Run the app, passing the response start, body chunks and a final None to `put`."""
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": query_string,
+            "headers": headers,
+            "client": ("127.0.0.1", 0),
+            "server": ("localhost", 80),
+        }
+        request_sent = False
+        response_complete = asyncio.Event()
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # A client that leaves early cancels the call instead of disconnecting
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                put((message["status"], message.get("headers", [])))
+            elif message["type"] == "http.response.body":
+                if message.get("body"):
+                    put(message["body"])
+                if not message.get("more_body", False):
+                    response_complete.set()
+
+        try:
+            await self.app(scope, receive, send)
+        except Exception as error:
+            # Errors raised after a complete response were already turned into it by the app
+            if not response_complete.is_set():
+                put(error)
+        finally:
+            response_complete.set()
+            put(None)
+
+
+def import_fastapi_main(app_dir):
+    """Import the FastAPI `main` module from its source directory.
+
+    Both backends have top-level modules with the same names (main, tasks, insights), so the
+    Flask ones are set aside while the FastAPI app is imported and restored afterwards. The
+    imported FastAPI modules stay reachable through the returned module.
+    """
+    app_dir = os.path.abspath(app_dir)
+    names = {
+        os.path.splitext(entry)[0]
+        for entry in os.listdir(app_dir)
+        if entry != "common"
+        and (entry.endswith(".py") or os.path.isdir(os.path.join(app_dir, entry)))
+    }
+
+    def owned(module_name):
+        return module_name.split(".")[0] in names
+
+    flask_modules = {name: module for name, module in sys.modules.items() if owned(name)}
+    for name in flask_modules:
+        del sys.modules[name]
+    sys.path.insert(0, app_dir)
+    try:
+        main = importlib.import_module("main")
+    finally:
+        sys.path.remove(app_dir)
+        for name in [name for name in sys.modules if owned(name)]:
+            del sys.modules[name]
+        sys.modules.update(flask_modules)
+    return main
@@ -12,30 +12,26 @@ def index():
     today = date.today()
     last_month = today - timedelta(days=30)
     with get_db() as db:
+        # Scores only: the text of an insight is fetched from the API when it is opened
         insights = (
-            db.query(DailyInsight)
+            db.query(
+                DailyInsight.id,
+                DailyInsight.date,
+                DailyInsight.type,
+                DailyInsight.focus_score,
+                DailyInsight.productivity_score,
+                DailyInsight.sentiment_score,
+                DailyInsight.general_score,
+            )
             .filter(DailyInsight.date >= last_month)
             .order_by(DailyInsight.date.desc())
             .all()
         )
 
     # Convert insights to dictionaries for JSON serialization
-    insights_data = []
-    for insight in insights:
-        insights_data.append(
-            {
-                "id": insight.id,
-                "date": insight.date.isoformat(),
-                "text": insight.text,
-                "type": insight.type,
-                "focus_score": insight.focus_score,
-                "productivity_score": insight.productivity_score,
-                "sentiment_score": insight.sentiment_score,
-                "general_score": insight.general_score,
-                "created_at": insight.created_at.isoformat() if insight.created_at else None,
-                "updated_at": insight.updated_at.isoformat() if insight.updated_at else None,
-            }
-        )
+    insights_data = [
+        {**insight._asdict(), "date": insight.date.isoformat()} for insight in insights
+    ]
 
     return render_template("insights/index.html", today=today, insights=insights_data)
 
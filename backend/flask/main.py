@@ -1,16 +1,43 @@
 import os
-
-import requests
+import time
+
+from api_proxy import get_api_bridge, proxy_api_request
+from common.database import SessionLocal, get_pool_status
+from common.metrics import (
+    CONTENT_TYPE,
+    http_request_seconds,
+    http_requests,
+    render_metrics,
+)
+from common.query_stats import current_query_stats, start_query_stats
+from common.tasks.score_store import track_task_score_changes
 from dotenv import load_dotenv
-from flask import Flask, jsonify, redirect, render_template, request, url_for
+from flask import (
+    Flask,
+    Response,
+    g,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
 from flask_babel import Babel
 from flask_login import LoginManager, UserMixin, current_user, login_user
 from insights.insights import insights_bp
+from tasks.calendar_cache import calendar_cache
 from tasks.tasks import tasks_bp
 from werkzeug.security import check_password_hash
 
 load_dotenv()
 
+# Keep the materialized recommendation scores in sync with direct database writes
+track_task_score_changes(SessionLocal)
+
+# Import the FastAPI app now, so a deployment without it fails here and not on the first call
+if os.getenv("API_TRANSPORT", "http") == "inprocess":
+    get_api_bridge()
+
 app = Flask(__name__)
 app.config["SECRET_KEY"] = os.urandom(24)
 app.config["BABEL_DEFAULT_LOCALE"] = "es"
@@ -44,15 +71,41 @@ def load_user(user_id):
     return User(user_id)
 
 
-PUBLIC_ENDPOINTS = ["login", "healthcheck", "static"]
+PUBLIC_ENDPOINTS = ["login", "healthcheck", "metrics", "static"]
 
 
 @app.before_request
 def before_request():
+    g.request_start = time.perf_counter()
+    start_query_stats(f"{request.method} {request.path}")
     if request.endpoint not in PUBLIC_ENDPOINTS and not current_user.is_authenticated:
         return redirect(url_for("login"))
 
 
+@app.after_request
+def instrument_response(response):
+    if "request_start" in g:
+        # Rule templates, not paths, keep the number of label values bounded
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        seconds = time.perf_counter() - g.request_start
+        http_request_seconds.observe(seconds, "flask", request.method, route)
+        http_requests.inc("flask", request.method, route, str(response.status_code))
+
+    # Statements and database time of each request, to spot N+1 query patterns
+    stats = current_query_stats()
+    if stats is not None:
+        response.headers.update(stats.headers())
+        app.logger.debug(
+            "%s %s: %d queries in %.2f ms",
+            request.method,
+            request.path,
+            stats.count,
+            stats.milliseconds,
+            extra=stats.log_fields(),
+        )
+    return response
+
+
 app.register_blueprint(tasks_bp)
 app.register_blueprint(insights_bp)
 
@@ -62,6 +115,15 @@ def healthcheck():
     return jsonify({"status": "ok"})
 
 
+@app.route("/metrics")
+def metrics():
+    # Scraped without a login session, with the key shared with the API instead
+    api_key = os.getenv("FASTAPI_API_KEY")
+    if not api_key or request.headers.get("X-API-Key") != api_key:
+        return jsonify({"error": "Access forbidden"}), 403
+    return Response(render_metrics(get_pool_status()), content_type=CONTENT_TYPE)
+
+
 @app.route("/")
 def index():
     return redirect(url_for("tasks.calendar"))
@@ -82,36 +144,10 @@ def login():
 
 @app.route("/api/<path:path>", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
 def api_proxy(path):
-    api_key = os.getenv("FASTAPI_API_KEY")
-    api_url = os.getenv("API_BASE_URL", "http://localhost:8001")
-    if not api_url.startswith("http"):
-        api_url = f"http://{api_url}"
-
-    headers = {"X-API-Key": api_key}
-    if request.data:
-        headers["Content-Type"] = "application/json"
-
-    try:
-        response = requests.request(
-            method=request.method,
-            url=f"{api_url}/{path}",
-            headers=headers,
-            params=request.args,
-            json=request.get_json(silent=True),
-        )
-        response.raise_for_status()
-        if response.status_code == 204 or not response.content:
-            return "", response.status_code
-        return jsonify(response.json()), response.status_code
-    except requests.exceptions.HTTPError as e:
-        # Try to return backend error message
-        try:
-            error_json = e.response.json()
-        except ValueError:
-            error_json = {"error": "An unknown error occurred"}
-        return jsonify(error_json), e.response.status_code
-    except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+    response = proxy_api_request(path)
+    if request.method != "GET":
+        calendar_cache.clear()
+    return response
 
 
 @app.route("/notification", methods=["POST"])
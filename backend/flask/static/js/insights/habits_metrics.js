@@ -148,19 +148,15 @@
 
   async function loadHabitEntries(habitId, habitType) {
     try {
-      const data = await makeApiRequest(
-        `${API}/habits/${habitId}/entries`,
-        "GET",
-      );
+      const data = await makeApiListRequest(`${API}/habits/${habitId}/entries`);
       renderHabitChart(data, habitType);
     } catch {}
   }
 
   async function loadMetricEntries(metricId, unit) {
     try {
-      const data = await makeApiRequest(
+      const data = await makeApiListRequest(
         `${API}/metrics/${metricId}/entries`,
-        "GET",
       );
       renderMetricChart(data, unit);
     } catch {}
@@ -315,21 +311,17 @@
     editingEntryId = entryId;
     entryFormTitle.textContent = "Editar registro";
     btnCancelEntry.style.display = "inline-block";
-    // Refetch list and prefill, since no history table
+    // Fetch the entry and prefill, since no history table
     if (selected.type === "habit") {
-      makeApiRequest(`${API}/habits/${selected.id}/entries`, "GET").then(
-        (list) => {
-          const e = list.find((x) => x.id === entryId);
-          fillEntryFormFrom(e, "habit");
-        },
-      );
+      makeApiRequest(
+        `${API}/habits/${selected.id}/entries/${entryId}`,
+        "GET",
+      ).then((e) => fillEntryFormFrom(e, "habit"));
     } else if (selected.type === "metric") {
-      makeApiRequest(`${API}/metrics/${selected.id}/entries`, "GET").then(
-        (list) => {
-          const e = list.find((x) => x.id === entryId);
-          fillEntryFormFrom(e, "metric");
-        },
-      );
+      makeApiRequest(
+        `${API}/metrics/${selected.id}/entries/${entryId}`,
+        "GET",
+      ).then((e) => fillEntryFormFrom(e, "metric"));
     }
   }
 
@@ -109,18 +109,25 @@ const dayLayout = {
 
 Plotly.newPlot("dayChart", dayData, dayLayout);
 
-function showText(date, type) {
-  // Find the insight in the loaded data
+async function showText(date, type) {
+  // Find the insight in the loaded data, its text is loaded on demand
   const insight = window.insightsData.find(
     (i) => i.date === date && i.type === type,
   );
+  let text = "Texto no encontrado.";
   if (insight) {
-    document.getElementById("insightText").textContent = insight.text;
-    new bootstrap.Modal(document.getElementById("textModal")).show();
-  } else {
-    document.getElementById("insightText").textContent = "Texto no encontrado.";
-    new bootstrap.Modal(document.getElementById("textModal")).show();
+    try {
+      const data = await makeApiRequest(
+        `${APP_CONFIG.API_BASE_URL}/insights/daily-insights/${insight.id}`,
+        "GET",
+      );
+      text = data.text;
+    } catch (error) {
+      // Error is already handled by makeApiRequest
+    }
   }
+  document.getElementById("insightText").textContent = text;
+  new bootstrap.Modal(document.getElementById("textModal")).show();
 }
 
 // Handle form submission
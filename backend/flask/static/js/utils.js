@@ -84,19 +84,21 @@ function fadeOutNotification(element) {
   }, APP_CONFIG.FADEOUT_DURATION);
 }
 
+async function apiError(response, method) {
+  let errorMsg = `Failed to ${method.toLowerCase()}`;
+  try {
+    const errorData = await response.json();
+    if (errorData && errorData.detail) errorMsg = errorData.detail;
+  } catch {}
+  return new Error(errorMsg);
+}
+
 async function makeApiRequest(url, method, body = null) {
   try {
     const options = { method, headers: { "Content-Type": "application/json" } };
     if (body) options.body = JSON.stringify(body);
     const response = await fetch(url, options);
-    if (!response.ok) {
-      let errorMsg = `Failed to ${method.toLowerCase()}`;
-      try {
-        const errorData = await response.json();
-        if (errorData && errorData.detail) errorMsg = errorData.detail;
-      } catch {}
-      throw new Error(errorMsg);
-    }
+    if (!response.ok) throw await apiError(response, method);
     return response.json();
   } catch (error) {
     console.error("Error with API request:", error);
@@ -105,6 +107,28 @@ async function makeApiRequest(url, method, body = null) {
   }
 }
 
+// Every row of a paginated list endpoint, following its X-Next-Cursor header
+async function makeApiListRequest(url, pageSize = 1000) {
+  const rows = [];
+  let cursor = null;
+  try {
+    do {
+      const pageUrl = new URL(url, window.location.origin);
+      pageUrl.searchParams.set("limit", pageSize);
+      if (cursor) pageUrl.searchParams.set("cursor", cursor);
+      const response = await fetch(pageUrl);
+      if (!response.ok) throw await apiError(response, "GET");
+      rows.push(...(await response.json()));
+      cursor = response.headers.get("X-Next-Cursor");
+    } while (cursor);
+    return rows;
+  } catch (error) {
+    console.error("Error with API request:", error);
+    showNotification(`Error: ${error.message}`, "danger");
+    throw error;
+  }
+}
+
 function safeSetTextContent(id, text) {
   const el = document.getElementById(id);
   if (el) el.textContent = text;
@@ -117,4 +141,5 @@ window.showNotification = showNotification;
 window.showSimpleNotification = showSimpleNotification;
 window.fadeOutNotification = fadeOutNotification;
 window.makeApiRequest = makeApiRequest;
+window.makeApiListRequest = makeApiListRequest;
 window.safeSetTextContent = safeSetTextContent;
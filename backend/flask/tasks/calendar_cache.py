@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+import select
+import threading
+import time
+
+from common.database import DB_TRANSACTION_POOLER, engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "row_changes"
+# Tables of the change feed (supabase/migrations/*_change_feed.sql) shown by the calendar
+CALENDAR_TABLES = {"task", "task_planning"}
+RECONNECT_SECONDS = 5
+PING_SECONDS = 60
+
+
+class TTLCache:
+    """Thread-safe key/value cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ChangeListener:
+    """Clears a cache whenever the change feed reports a write to one of `tables`.
+
+    Runs on a daemon thread with its own connection, detached from the pool. LISTEN needs a
+    session connection, so nothing is started behind a transaction pooler.
+    """
+
+    def __init__(self, cache, tables):
+        self.cache = cache
+        self.tables = tables
+        self._started = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._started or DB_TRANSACTION_POOLER:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name="calendar-cache-listener", daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Calendar cache change listener failed, reconnecting")
+            # Changes may have been missed while disconnected
+            self.cache.clear()
+            time.sleep(RECONNECT_SECONDS)
+
+    def _listen(self):
+        connection = engine.raw_connection()
+        driver_connection = connection.driver_connection
+        connection.detach()
+        try:
+            driver_connection.autocommit = True
+            with driver_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+                while True:
+                    if not select.select([driver_connection], [], [], PING_SECONDS)[0]:
+                        # Idle: a dropped connection only shows up when something is sent
+                        cursor.execute("SELECT 1")
+                    driver_connection.poll()
+                    notifies = list(driver_connection.notifies)
+                    driver_connection.notifies.clear()
+                    if any(self._concerns(notify.payload) for notify in notifies):
+                        self.cache.clear()
+        finally:
+            connection.close()
+
+    def _concerns(self, payload):
+        try:
+            return json.loads(payload).get("table") in self.tables
+        except ValueError:
+            return True
+
+
+# Plannings per day and calendar recommendations, as plain dicts shared across requests.
+# Writes proxied to the API clear it right away and the change listener clears it on task and
+# planning writes from any client. The TTL still bounds how long other changes that affect
+# recommendations (projects, the daily score refresh) stay invisible, and all changes when
+# no listener runs (DB_TRANSACTION_POOLER).
+calendar_cache = TTLCache(float(os.getenv("CALENDAR_CACHE_TTL", "60")))
+calendar_change_listener = ChangeListener(calendar_cache, CALENDAR_TABLES)
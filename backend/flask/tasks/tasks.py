@@ -2,12 +2,15 @@ from collections import defaultdict
 from datetime import date, timedelta
 
 from common.database import get_db_context as get_db
+from common.tasks.backends import recommendation_backend
 from common.tasks.models import Project, Task, TaskPlanning
 from common.tasks.recommendations import get_task_recommendations
 from flask import Blueprint, jsonify, render_template
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import contains_eager, selectinload, undefer
 from sqlalchemy.sql import case
 
+from .calendar_cache import calendar_cache, calendar_change_listener
+
 tasks_bp = Blueprint("tasks", __name__, url_prefix="/tasks", template_folder="templates")
 
 
@@ -15,13 +18,16 @@ TASK_STATE_ORDER = {"in_progress": 0, "pending": 1, "completed": 2, "archived":
 
 PROJECT_STATE_ORDER = {"in_progress": 0, "not_started": 1, "completed": 2, "archived": 3}
 
+CALENDAR_VISIBLE_DAYS = 4
+CALENDAR_PREFETCH_DAYS = 3
+
 
 @tasks_bp.route("/projects")
 def projects():
     with get_db() as db:
         projects = (
             db.query(Project)
-            .options(selectinload(Project.tasks))
+            .options(undefer(Project.pending_tasks_count))
             .order_by(Project.updated_at.desc())
             .all()
         )
@@ -71,51 +77,92 @@ def project_detail(project_id):
     )
 
 
+def _load_plannings_by_day(db, first_day, last_day):
+    """Plannings of [first_day, last_day] in display order, one list per day."""
+    plannings = (
+        db.query(TaskPlanning)
+        .join(Task)
+        .options(contains_eager(TaskPlanning.task).selectinload(Task.project))
+        .filter(TaskPlanning.planned_date >= first_day)
+        .filter(TaskPlanning.planned_date <= last_day)
+        .order_by(
+            case((Task.state == "completed", 1), else_=0),
+            TaskPlanning.done.asc(),
+            TaskPlanning.planned_date,
+            TaskPlanning.start_hour,
+            TaskPlanning.end_hour,
+            TaskPlanning.priority.desc(),
+        )
+        .all()
+    )
+    plannings_by_day = {
+        first_day + timedelta(days=i): [] for i in range((last_day - first_day).days + 1)
+    }
+    for planning in plannings:
+        plannings_by_day[planning.planned_date].append(_planning_view(planning))
+    return plannings_by_day
+
+
+def _planning_view(planning):
+    """What the calendar template shows of a planning, as plain values safe to cache."""
+    task = planning.task
+    return {
+        "id": planning.id,
+        "done": planning.done,
+        "start_hour": planning.start_hour,
+        "end_hour": planning.end_hour,
+        "priority": planning.priority,
+        "task": {
+            "id": task.id,
+            "title": task.title,
+            "state": task.state,
+            "priority": task.priority,
+            "project": {"id": task.project.id, "name": task.project.name} if task.project else None,
+        },
+    }
+
+
 @tasks_bp.route("/calendar")
 def calendar():
     from flask import request
 
-    with get_db() as db:
-        # Parse start_date from query params
-        start_date_param = request.args.get("start_date")
-        try:
-            start_date = date.fromisoformat(start_date_param) if start_date_param else date.today()
-        except ValueError:
-            start_date = date.today()
-
-        visible_window_days = [start_date + timedelta(days=i) for i in range(4)]
-
-        # Extended loading range: previous day and next 10 days from start
-        load_start = start_date - timedelta(days=1)
-        load_end = start_date + timedelta(days=10)
-
-        plannings_extended = (
-            db.query(TaskPlanning)
-            .join(Task)
-            .options(joinedload(TaskPlanning.task).selectinload(Task.project))
-            .filter(TaskPlanning.planned_date >= load_start)
-            .filter(TaskPlanning.planned_date <= load_end)
-            .order_by(
-                case((Task.state == "completed", 1), else_=0),
-                TaskPlanning.done.asc(),
-                TaskPlanning.planned_date,
-                TaskPlanning.start_hour,
-                TaskPlanning.end_hour,
-                TaskPlanning.priority.desc(),
-            )
-            .all()
-        )
-
-        # Only build dict for visible 4-day window
-        plannings_by_day = defaultdict(list)
-        for day in visible_window_days:
-            plannings_by_day[day] = []
-
-        for planning in plannings_extended:
-            if planning.planned_date in plannings_by_day:
-                plannings_by_day[planning.planned_date].append(planning)
+    # Parse start_date from query params
+    start_date_param = request.args.get("start_date")
+    try:
+        start_date = date.fromisoformat(start_date_param) if start_date_param else date.today()
+    except ValueError:
+        start_date = date.today()
+
+    visible_window_days = [start_date + timedelta(days=i) for i in range(CALENDAR_VISIBLE_DAYS)]
+    calendar_change_listener.start()
+
+    plannings_by_day = {day: calendar_cache.get(("plannings", day)) for day in visible_window_days}
+    missing_days = [day for day, plannings in plannings_by_day.items() if plannings is None]
+    recommended_tasks = calendar_cache.get("recommendations")
+
+    if missing_days or recommended_tasks is None:
+        with get_db() as db:
+            # Recommendations first: a daily score refresh commits, expiring loaded rows
+            if recommended_tasks is None:
+                recommended_tasks = [
+                    {
+                        "task": {"id": r["task"].id, "title": r["task"].title},
+                        "score": r["score"],
+                    }
+                    for r in recommendation_backend()(db, 12, for_planning=True)
+                ]
+                calendar_cache.set("recommendations", recommended_tasks)
+            if missing_days:
+                # Neighbouring days are loaded too, so moving a day forward or back is a cache hit
+                loaded = _load_plannings_by_day(
+                    db,
+                    missing_days[0] - timedelta(days=CALENDAR_PREFETCH_DAYS),
+                    missing_days[-1] + timedelta(days=CALENDAR_PREFETCH_DAYS),
+                )
+                for day, plannings in loaded.items():
+                    calendar_cache.set(("plannings", day), plannings)
+                plannings_by_day.update((day, loaded[day]) for day in missing_days)
 
-        recommended_tasks = get_task_recommendations(db, 12, for_planning=True)
     return render_template(
         "tasks/calendar.html",
         planning_by_day=plannings_by_day,
@@ -146,19 +193,9 @@ def pending_tasks():
 
         # Order tasks without due date by recommendation scores
         if tasks_without_due_date:
-            # Get recommendations for all tasks without due dates
-            all_recommendations = get_task_recommendations(db)
-
-            # Create a mapping of task_id to score for tasks without due dates
-            task_scores = {}
-            tasks_without_due_date_ids = {task.id for task in tasks_without_due_date}
-
-            for recommendation in all_recommendations:
-                if recommendation["task"].id in tasks_without_due_date_ids:
-                    task_scores[recommendation["task"].id] = recommendation["score"]
-
-            # Sort tasks without due date by their recommendation scores (descending)
-            tasks_without_due_date.sort(key=lambda task: task_scores.get(task.id, 0), reverse=True)
+            # Score only the already loaded tasks without due dates, best first
+            recommendations = get_task_recommendations(db, tasks=tasks_without_due_date)
+            tasks_without_due_date = [recommendation["task"] for recommendation in recommendations]
 
         # Group tasks by due date (convert date to string for JSON serialization)
         tasks_by_date = defaultdict(list)
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FLASK_DIR = os.path.join(BACKEND_DIR, "flask")
+
+# `common` is imported from /backend, after the installed packages: flask/__init__.py would
+# shadow Flask (`python -m pytest` puts the working directory first). The Flask app directory
+# goes first, the app hosting both when run in-process
+sys.path[:] = [path for path in sys.path if os.path.abspath(path) != BACKEND_DIR]
+sys.path.append(BACKEND_DIR)
+sys.path.insert(0, FLASK_DIR)
+
+API_KEY = os.environ.setdefault("FASTAPI_API_KEY", "test")
+
+
+def _require_database():
+    if not os.getenv("SUPABASE_PSQL_URL"):
+        pytest.skip("SUPABASE_PSQL_URL is not set")
+
+
+@pytest.fixture
+def db():
+    """Session on the SUPABASE_PSQL_URL database, rolled back after the test."""
+    _require_database()
+    from common.database import SessionLocal
+
+    with SessionLocal() as session:
+        yield session
+        session.rollback()
+
+
+@pytest.fixture(scope="session")
+def api_client():
+    """TestClient of the FastAPI app, sending the API key."""
+    _require_database()
+    from asgi_bridge import import_fastapi_main
+    from fastapi.testclient import TestClient
+
+    fastapi_main = import_fastapi_main(os.path.join(BACKEND_DIR, "fastapi"))
+    with TestClient(fastapi_main.app, headers={"X-API-Key": API_KEY}) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def web_client():
+    """Test client of the Flask app, logged in."""
+    _require_database()
+    import main
+
+    client = main.app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = "user"
+    return client
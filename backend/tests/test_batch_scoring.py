@@ -0,0 +1,95 @@
+import random
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from common.tasks.batch_scoring import score_columns, top_n_indices
+from common.tasks.enums import TaskState
+from common.tasks.recommendations import score_task
+
+TODAY = date(2025, 10, 18)
+
+
+def make_backlog(size, seed=0):
+    """Open tasks with their future plannings, as plain objects, plus repeated rows for ties."""
+    rng = random.Random(seed)
+    backlog = []
+    for _ in range(size):
+        project = SimpleNamespace(priority=rng.choice([None, 1, 2, 3, 4, 5]))
+        task = SimpleNamespace(
+            priority=rng.choice([None, 1, 2, 3, 4, 5]),
+            due_date=rng.choice([None, TODAY + timedelta(days=rng.randint(-30, 60))]),
+            state=rng.choice([TaskState.PENDING, TaskState.IN_PROGRESS]),
+            created_at=rng.choice(
+                [
+                    None,
+                    datetime.combine(TODAY, datetime.min.time()) - timedelta(rng.randint(0, 400)),
+                ]
+            ),
+            project=project,
+        )
+        plannings = [
+            SimpleNamespace(planned_date=TODAY + timedelta(days=rng.randint(0, 20)))
+            for _ in range(rng.choice([0, 0, 1, 2]))
+        ]
+        backlog.append((task, plannings))
+    # Identical copies score the same, so ties must keep load order
+    backlog += [backlog[i] for i in rng.sample(range(size), size // 4)]
+    return backlog
+
+
+def to_columns(backlog):
+    """The arrays load_scoring_columns builds in SQL, with NaN for NULL."""
+
+    def offset(day):
+        return np.nan if day is None else float((day - TODAY).days)
+
+    rows = []
+    for task, plannings in backlog:
+        nearest = min((p.planned_date for p in plannings), default=None)
+        rows.append(
+            (
+                np.nan if task.priority is None else task.priority,
+                offset(task.due_date),
+                float(task.state == TaskState.IN_PROGRESS),
+                float(task.state == TaskState.PENDING),
+                np.nan if task.created_at is None else float(-offset(task.created_at.date())),
+                np.nan if task.project.priority is None else task.project.priority,
+                offset(nearest),
+            )
+        )
+    names = ("priority", "due_in", "in_progress", "pending", "age", "project_priority")
+    columns = dict(zip(names + ("planned_in",), (np.array(c, dtype=float) for c in zip(*rows))))
+    columns["id"] = np.arange(len(backlog))
+    return columns
+
+
+def reference_scores(backlog, for_planning):
+    return [score_task(task, plannings, TODAY, for_planning) for task, plannings in backlog]
+
+
+@pytest.mark.parametrize("for_planning", [False, True])
+def test_score_columns_matches_score_task(for_planning):
+    backlog = make_backlog(500)
+    expected = reference_scores(backlog, for_planning)
+    scores = score_columns(to_columns(backlog), for_planning)
+
+    assert [np.isnan(score) for score in scores] == [score is None for score in expected]
+    for score, reference in zip(scores, expected):
+        if reference is not None:
+            assert score == pytest.approx(reference, abs=1e-9)
+
+
+@pytest.mark.parametrize("for_planning", [False, True])
+@pytest.mark.parametrize("limit", [None, 1, 5, 12, 100, 10000])
+def test_top_n_indices_matches_full_sort(for_planning, limit):
+    backlog = make_backlog(500, seed=1)
+    expected = reference_scores(backlog, for_planning)
+    # Full sort of the reference: best first, ties in load order
+    candidates = [i for i, score in enumerate(expected) if score is not None]
+    ranking = sorted(candidates, key=lambda i: expected[i], reverse=True)[:limit]
+
+    best = top_n_indices(score_columns(to_columns(backlog), for_planning), limit)
+
+    assert best.tolist() == ranking
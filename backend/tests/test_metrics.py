@@ -0,0 +1,6 @@
+def test_routes_are_labelled_with_their_mounted_path(api_client):
+    api_client.get("/tasks/tasks/0")
+
+    metrics = api_client.get("/metrics").text
+    assert 'route="/tasks/tasks/{task_id}",status="404"' in metrics
+    assert 'route="/tasks/{task_id}"' not in metrics
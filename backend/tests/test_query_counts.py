@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+from uuid import uuid4
+
+import pytest
+from common.query_stats import assert_no_n_plus_one
+from common.tasks.models import Note, Project, Task, TaskPlanning
+
+
+@pytest.fixture
+def commit():
+    """Commit rows for the app under test to read; they are deleted after the test."""
+    from common.database import SessionLocal
+
+    session = SessionLocal()
+    added = []
+
+    def add(*rows):
+        session.add_all(rows)
+        session.commit()
+        added.extend(rows)
+
+    yield add
+    for row in reversed(added):
+        session.delete(row)
+    session.commit()
+    session.close()
+
+
+def test_projects_page(web_client, commit):
+    prefix = f"query count {uuid4().hex[:8]}"
+    projects = []
+
+    def fetch(size):
+        new = [Project(name=f"{prefix} {i}") for i in range(len(projects), size)]
+        commit(*new)
+        projects.extend(new)
+        response = web_client.get("/tasks/projects")
+        assert response.status_code == 200
+        return response
+
+    assert_no_n_plus_one(fetch)
+
+
+def test_task_general_info(api_client, commit):
+    task = Task(title="query count")
+    commit(task)
+    rows = []
+
+    def fetch(size):
+        new = []
+        for i in range(len(rows) // 2, size):
+            new.append(Note(task_id=task.id, content=f"note {i}"))
+            new.append(TaskPlanning(task_id=task.id, planned_date=date.today() + timedelta(i % 7)))
+        commit(*new)
+        rows.extend(new)
+        response = api_client.get(f"/tasks/tasks/{task.id}/general-info")
+        assert response.status_code == 200
+        return response
+
+    assert_no_n_plus_one(fetch)
@@ -0,0 +1,5 @@
+from common.query_plans import check_query_plans
+
+
+def test_hot_queries_use_their_indexes(db):
+    assert check_query_plans(db) == []
@@ -0,0 +1,32 @@
+from datetime import date
+
+from common.tasks.models import TaskScoreRefresh
+from common.tasks.score_store import (
+    SCORE_REFRESH_LOCK_ID,
+    get_stored_task_recommendations,
+    refresh_stale_task_scores,
+)
+from sqlalchemy import func, select, update
+
+
+def _mark_stale(db):
+    db.execute(update(TaskScoreRefresh).values(refreshed_on=date(2000, 1, 1)))
+
+
+def test_stale_scores_are_rebuilt_by_one_transaction(db):
+    from common.database import SessionLocal
+
+    with SessionLocal() as holder:
+        holder.execute(select(func.pg_advisory_xact_lock(SCORE_REFRESH_LOCK_ID)))
+        _mark_stale(db)
+        # Another transaction is rebuilding: the current scores are served meanwhile
+        assert refresh_stale_task_scores(db) is False
+        assert db.query(TaskScoreRefresh.refreshed_on).scalar() == date(2000, 1, 1)
+        holder.rollback()
+
+
+def test_fresh_scores_are_read_without_writing(db):
+    get_stored_task_recommendations(db, 1)
+    db.commit()
+    assert refresh_stale_task_scores(db) is False
+    assert not db.new and not db.dirty
@@ -0,0 +1,63 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from common.tasks.enums import ProjectState, TaskState
+from common.tasks.models import Project, Task, TaskPlanning
+from common.tasks.recommendations import get_task_recommendations
+from common.tasks.sql_scoring import get_task_recommendations_sql
+
+
+@pytest.fixture
+def backlog(db):
+    """Random open tasks and plannings added to whatever the database already holds."""
+    rng = random.Random(0)
+    today = datetime.now().date()
+    projects = [
+        Project(
+            name=f"SQL scoring test {i}",
+            state=ProjectState.IN_PROGRESS.value,
+            priority=rng.choice([None, 1, 3, 5]),
+        )
+        for i in range(5)
+    ]
+    db.add_all(projects)
+    db.flush()
+    for i in range(300):
+        task = Task(
+            title=f"SQL scoring test {i}",
+            project_id=rng.choice(projects).id,
+            state=rng.choice([TaskState.PENDING.value, TaskState.IN_PROGRESS.value]),
+            priority=rng.choice([None, 1, 2, 3, 4, 5]),
+            due_date=rng.choice([None, today + timedelta(days=rng.randint(-30, 60))]),
+            created_at=datetime.now() - timedelta(days=rng.randint(0, 400)),
+        )
+        task.plannings = [
+            TaskPlanning(planned_date=today + timedelta(days=rng.randint(-5, 20)))
+            for _ in range(rng.choice([0, 0, 1, 2]))
+        ]
+        db.add(task)
+    db.flush()
+    return db
+
+
+@pytest.mark.parametrize("for_planning", [False, True])
+def test_sql_scores_match_score_task(backlog, for_planning):
+    expected = {
+        r["task"].id: r["score"] for r in get_task_recommendations(backlog, None, for_planning)
+    }
+    scores = {
+        r["task"].id: r["score"] for r in get_task_recommendations_sql(backlog, None, for_planning)
+    }
+
+    assert scores.keys() == expected.keys()
+    for task_id, score in scores.items():
+        assert score == pytest.approx(expected[task_id], abs=1e-9)
+
+
+@pytest.mark.parametrize("for_planning", [False, True])
+def test_sql_top_n_matches_score_task(backlog, for_planning):
+    expected = get_task_recommendations(backlog, None, for_planning)
+    top = get_task_recommendations_sql(backlog, 12, for_planning)
+
+    assert [r["score"] for r in top] == pytest.approx([r["score"] for r in expected[:12]])
@@ -0,0 +1,19 @@
+-- Materialized recommendation scores, one row per open task of an in-progress project
+CREATE TABLE IF NOT EXISTS task_score (
+    task_id INTEGER PRIMARY KEY REFERENCES task (id) ON DELETE CASCADE,
+    score DOUBLE PRECISION NOT NULL,
+    planning_score DOUBLE PRECISION,
+    scored_on DATE NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_score_score ON task_score (score DESC);
+
+CREATE INDEX IF NOT EXISTS idx_task_score_planning_score
+ON task_score (planning_score DESC)
+WHERE planning_score IS NOT NULL;
+
+CREATE TRIGGER update_task_score_updated_at
+BEFORE UPDATE ON task_score
+FOR EACH ROW
+EXECUTE FUNCTION UPDATE_UPDATED_AT_COLUMN();
@@ -0,0 +1,26 @@
+-- Foreign-key and date indexes for the calendar, general-info and recommendation queries
+CREATE INDEX IF NOT EXISTS idx_project_state ON project (state);
+
+CREATE INDEX IF NOT EXISTS idx_task_project_id ON task (project_id);
+
+-- Open tasks are the only candidates of the recommendation queries
+CREATE INDEX IF NOT EXISTS idx_task_open_project_id
+ON task (project_id)
+WHERE state IN ('pending', 'in_progress');
+
+-- Plannings of one task, e.g. its nearest future planning
+CREATE INDEX IF NOT EXISTS idx_task_planning_task_id_planned_date
+ON task_planning (task_id, planned_date);
+
+-- Calendar date ranges
+CREATE INDEX IF NOT EXISTS idx_task_planning_planned_date_task_id
+ON task_planning (planned_date, task_id);
+
+-- Latest notes of a task or project
+CREATE INDEX IF NOT EXISTS idx_note_task_id_updated_at
+ON note (task_id, updated_at DESC)
+WHERE task_id IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_note_project_id_updated_at
+ON note (project_id, updated_at DESC)
+WHERE project_id IS NOT NULL;
@@ -0,0 +1,55 @@
+-- Row-level change notifications on the `row_changes` channel, relayed by the API change feed
+CREATE OR REPLACE FUNCTION NOTIFY_ROW_CHANGE()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed RECORD;
+    payload TEXT;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+    payload := JSON_BUILD_OBJECT(
+        'table', TG_TABLE_NAME, 'op', LOWER(TG_OP), 'id', changed.id, 'row', TO_JSONB(changed)
+    )::TEXT;
+    -- NOTIFY payloads are limited to 8000 bytes: larger rows are sent without their data
+    IF OCTET_LENGTH(payload) > 7900 THEN
+        payload := JSON_BUILD_OBJECT(
+            'table', TG_TABLE_NAME, 'op', LOWER(TG_OP), 'id', changed.id, 'row', NULL
+        )::TEXT;
+    END IF;
+    PERFORM PG_NOTIFY('row_changes', payload);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notify_task_change
+AFTER INSERT OR UPDATE OR DELETE ON task
+FOR EACH ROW
+EXECUTE FUNCTION NOTIFY_ROW_CHANGE();
+
+CREATE TRIGGER notify_task_planning_change
+AFTER INSERT OR UPDATE OR DELETE ON task_planning
+FOR EACH ROW
+EXECUTE FUNCTION NOTIFY_ROW_CHANGE();
+
+CREATE TRIGGER notify_note_change
+AFTER INSERT OR UPDATE OR DELETE ON note
+FOR EACH ROW
+EXECUTE FUNCTION NOTIFY_ROW_CHANGE();
+
+CREATE TRIGGER notify_daily_insights_change
+AFTER INSERT OR UPDATE OR DELETE ON daily_insights
+FOR EACH ROW
+EXECUTE FUNCTION NOTIFY_ROW_CHANGE();
+
+CREATE TRIGGER notify_habit_entry_change
+AFTER INSERT OR UPDATE OR DELETE ON habit_entry
+FOR EACH ROW
+EXECUTE FUNCTION NOTIFY_ROW_CHANGE();
+
+CREATE TRIGGER notify_metric_entry_change
+AFTER INSERT OR UPDATE OR DELETE ON metric_entry
+FOR EACH ROW
+EXECUTE FUNCTION NOTIFY_ROW_CHANGE();
@@ -0,0 +1,83 @@
+-- Weekly and monthly averages of the daily insight scores, kept up to date by a trigger
+CREATE TABLE IF NOT EXISTS daily_insights_rollup (
+    period VARCHAR(5) NOT NULL CHECK (period IN ('week', 'month')),
+    period_start DATE NOT NULL,
+    type CHAR(3) NOT NULL CHECK (type IN ('job', 'day')),
+    insights INTEGER NOT NULL,
+    focus_score NUMERIC,
+    productivity_score NUMERIC,
+    sentiment_score NUMERIC,
+    general_score NUMERIC,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (period, type, period_start)
+);
+
+-- Recomputes the week and month of the inserted, updated or deleted insight from its rows
+CREATE OR REPLACE FUNCTION REFRESH_DAILY_INSIGHTS_ROLLUP()
+RETURNS TRIGGER AS $$
+DECLARE
+    affected RECORD;
+BEGIN
+    FOR affected IN
+        SELECT DISTINCT
+            periods.period,
+            DATE_TRUNC(periods.period, changed.date)::DATE AS period_start,
+            changed.type
+        FROM (VALUES ('week'), ('month')) AS periods (period)
+        CROSS JOIN (
+            SELECT NEW.date, NEW.type WHERE TG_OP <> 'DELETE'
+            UNION
+            SELECT OLD.date, OLD.type WHERE TG_OP <> 'INSERT'
+        ) AS changed (date, type)
+    LOOP
+        DELETE FROM daily_insights_rollup
+        WHERE period = affected.period
+            AND type = affected.type
+            AND period_start = affected.period_start;
+
+        INSERT INTO daily_insights_rollup (
+            period, period_start, type, insights,
+            focus_score, productivity_score, sentiment_score, general_score
+        )
+        SELECT
+            affected.period,
+            affected.period_start,
+            affected.type,
+            COUNT(*),
+            AVG(focus_score),
+            AVG(productivity_score),
+            AVG(sentiment_score),
+            AVG(general_score)
+        FROM daily_insights
+        WHERE type = affected.type
+            AND date >= affected.period_start
+            AND date < affected.period_start + ('1 ' || affected.period)::INTERVAL
+        HAVING COUNT(*) > 0;
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER refresh_daily_insights_rollup
+AFTER INSERT OR UPDATE OR DELETE ON daily_insights
+FOR EACH ROW
+EXECUTE FUNCTION REFRESH_DAILY_INSIGHTS_ROLLUP();
+
+-- Existing insights
+INSERT INTO daily_insights_rollup (
+    period, period_start, type, insights,
+    focus_score, productivity_score, sentiment_score, general_score
+)
+SELECT
+    periods.period,
+    DATE_TRUNC(periods.period, daily_insights.date)::DATE,
+    daily_insights.type,
+    COUNT(*),
+    AVG(daily_insights.focus_score),
+    AVG(daily_insights.productivity_score),
+    AVG(daily_insights.sentiment_score),
+    AVG(daily_insights.general_score)
+FROM daily_insights
+CROSS JOIN (VALUES ('week'), ('month')) AS periods (period)
+GROUP BY 1, 2, 3
+ON CONFLICT DO NOTHING;
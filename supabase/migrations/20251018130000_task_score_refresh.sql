@@ -0,0 +1,11 @@
+-- Date of the last full rebuild of task_score, a single row
+CREATE TABLE IF NOT EXISTS task_score_refresh (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    refreshed_on DATE NOT NULL
+);
+
+-- Existing scores count as rebuilt on their oldest date
+INSERT INTO task_score_refresh (refreshed_on)
+SELECT MIN(scored_on) FROM task_score
+HAVING MIN(scored_on) IS NOT NULL
+ON CONFLICT (id) DO NOTHING;
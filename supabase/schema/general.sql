@@ -6,3 +6,29 @@ BEGIN
     RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;
+
+-- Función que publica los cambios de filas en el canal `row_changes` (feed de cambios de la API)
+CREATE OR REPLACE FUNCTION NOTIFY_ROW_CHANGE()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed RECORD;
+    payload TEXT;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+    payload := JSON_BUILD_OBJECT(
+        'table', TG_TABLE_NAME, 'op', LOWER(TG_OP), 'id', changed.id, 'row', TO_JSONB(changed)
+    )::TEXT;
+    -- Los payloads de NOTIFY se limitan a 8000 bytes: las filas mayores se envían sin datos
+    IF OCTET_LENGTH(payload) > 7900 THEN
+        payload := JSON_BUILD_OBJECT(
+            'table', TG_TABLE_NAME, 'op', LOWER(TG_OP), 'id', changed.id, 'row', NULL
+        )::TEXT;
+    END IF;
+    PERFORM PG_NOTIFY('row_changes', payload);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
@@ -75,3 +75,87 @@ CREATE TRIGGER update_metric_entry_updated_at
 BEFORE UPDATE ON metric_entry
 FOR EACH ROW
 EXECUTE FUNCTION UPDATE_UPDATED_AT_COLUMN();
+
+-- Notificación de cambios de la tabla daily_insights
+CREATE TRIGGER notify_daily_insights_change
+AFTER INSERT OR UPDATE OR DELETE ON daily_insights
+FOR EACH ROW
+EXECUTE FUNCTION NOTIFY_ROW_CHANGE();
+
+-- Notificación de cambios de la tabla habit_entry
+CREATE TRIGGER notify_habit_entry_change
+AFTER INSERT OR UPDATE OR DELETE ON habit_entry
+FOR EACH ROW
+EXECUTE FUNCTION NOTIFY_ROW_CHANGE();
+
+-- Notificación de cambios de la tabla metric_entry
+CREATE TRIGGER notify_metric_entry_change
+AFTER INSERT OR UPDATE OR DELETE ON metric_entry
+FOR EACH ROW
+EXECUTE FUNCTION NOTIFY_ROW_CHANGE();
+
+-- Medias semanales y mensuales de las puntuaciones de los insights diarios
+CREATE TABLE IF NOT EXISTS daily_insights_rollup (
+    period VARCHAR(5) NOT NULL CHECK (period IN ('week', 'month')),
+    period_start DATE NOT NULL,
+    type CHAR(3) NOT NULL CHECK (type IN ('job', 'day')),
+    insights INTEGER NOT NULL,
+    focus_score NUMERIC,
+    productivity_score NUMERIC,
+    sentiment_score NUMERIC,
+    general_score NUMERIC,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (period, type, period_start)
+);
+
+-- Recalcula la semana y el mes del insight insertado, modificado o borrado
+CREATE OR REPLACE FUNCTION REFRESH_DAILY_INSIGHTS_ROLLUP()
+RETURNS TRIGGER AS $$
+DECLARE
+    affected RECORD;
+BEGIN
+    FOR affected IN
+        SELECT DISTINCT
+            periods.period,
+            DATE_TRUNC(periods.period, changed.date)::DATE AS period_start,
+            changed.type
+        FROM (VALUES ('week'), ('month')) AS periods (period)
+        CROSS JOIN (
+            SELECT NEW.date, NEW.type WHERE TG_OP <> 'DELETE'
+            UNION
+            SELECT OLD.date, OLD.type WHERE TG_OP <> 'INSERT'
+        ) AS changed (date, type)
+    LOOP
+        DELETE FROM daily_insights_rollup
+        WHERE period = affected.period
+            AND type = affected.type
+            AND period_start = affected.period_start;
+
+        INSERT INTO daily_insights_rollup (
+            period, period_start, type, insights,
+            focus_score, productivity_score, sentiment_score, general_score
+        )
+        SELECT
+            affected.period,
+            affected.period_start,
+            affected.type,
+            COUNT(*),
+            AVG(focus_score),
+            AVG(productivity_score),
+            AVG(sentiment_score),
+            AVG(general_score)
+        FROM daily_insights
+        WHERE type = affected.type
+            AND date >= affected.period_start
+            AND date < affected.period_start + ('1 ' || affected.period)::INTERVAL
+        HAVING COUNT(*) > 0;
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger para mantener daily_insights_rollup
+CREATE TRIGGER refresh_daily_insights_rollup
+AFTER INSERT OR UPDATE OR DELETE ON daily_insights
+FOR EACH ROW
+EXECUTE FUNCTION REFRESH_DAILY_INSIGHTS_ROLLUP();
@@ -66,6 +66,30 @@ CREATE TABLE IF NOT EXISTS note (
     )
 );
 
+-- Índices de claves foráneas y fechas usados por el calendario y las recomendaciones
+CREATE INDEX IF NOT EXISTS idx_project_state ON project (state);
+
+CREATE INDEX IF NOT EXISTS idx_task_project_id ON task (project_id);
+
+-- Solo las tareas abiertas son candidatas a recomendación
+CREATE INDEX IF NOT EXISTS idx_task_open_project_id
+ON task (project_id)
+WHERE state IN ('pending', 'in_progress');
+
+CREATE INDEX IF NOT EXISTS idx_task_planning_task_id_planned_date
+ON task_planning (task_id, planned_date);
+
+CREATE INDEX IF NOT EXISTS idx_task_planning_planned_date_task_id
+ON task_planning (planned_date, task_id);
+
+CREATE INDEX IF NOT EXISTS idx_note_task_id_updated_at
+ON note (task_id, updated_at DESC)
+WHERE task_id IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_note_project_id_updated_at
+ON note (project_id, updated_at DESC)
+WHERE project_id IS NOT NULL;
+
 -- Trigger para la tabla note
 CREATE TRIGGER update_note_updated_at
 BEFORE UPDATE ON note
@@ -94,3 +118,48 @@ CREATE TRIGGER update_task_planning_updated_at
 BEFORE UPDATE ON task_planning
 FOR EACH ROW
 EXECUTE FUNCTION UPDATE_UPDATED_AT_COLUMN();
+
+-- Tabla de puntuaciones de recomendación materializadas
+CREATE TABLE IF NOT EXISTS task_score (
+    task_id INTEGER PRIMARY KEY REFERENCES task (id) ON DELETE CASCADE,
+    score DOUBLE PRECISION NOT NULL,
+    planning_score DOUBLE PRECISION,
+    scored_on DATE NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_score_score ON task_score (score DESC);
+
+CREATE INDEX IF NOT EXISTS idx_task_score_planning_score
+ON task_score (planning_score DESC)
+WHERE planning_score IS NOT NULL;
+
+-- Trigger para la tabla task_score
+CREATE TRIGGER update_task_score_updated_at
+BEFORE UPDATE ON task_score
+FOR EACH ROW
+EXECUTE FUNCTION UPDATE_UPDATED_AT_COLUMN();
+
+-- Fecha de la última reconstrucción completa de task_score, una sola fila
+CREATE TABLE IF NOT EXISTS task_score_refresh (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    refreshed_on DATE NOT NULL
+);
+
+-- Notificación de cambios de la tabla task
+CREATE TRIGGER notify_task_change
+AFTER INSERT OR UPDATE OR DELETE ON task
+FOR EACH ROW
+EXECUTE FUNCTION NOTIFY_ROW_CHANGE();
+
+-- Notificación de cambios de la tabla task_planning
+CREATE TRIGGER notify_task_planning_change
+AFTER INSERT OR UPDATE OR DELETE ON task_planning
+FOR EACH ROW
+EXECUTE FUNCTION NOTIFY_ROW_CHANGE();
+
+-- Notificación de cambios de la tabla note
+CREATE TRIGGER notify_note_change
+AFTER INSERT OR UPDATE OR DELETE ON note
+FOR EACH ROW
+EXECUTE FUNCTION NOTIFY_ROW_CHANGE();